@@ -0,0 +1,106 @@
+"""
+Shared helpers for the standalone benchmarks.
+
+Puts the repository root on sys.path so `import final` works when a script
+is run as `python benchmarks/<name>.py`, and provides a local HTTP(S)
+stand-in for the stageevaluate API.
+"""
+import json
+import os
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def self_signed_cert(directory):
+    """Create a localhost certificate with the openssl CLI and return (certfile, keyfile)"""
+    certfile = os.path.join(directory, "localhost.pem")
+    keyfile = os.path.join(directory, "localhost.key")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+         "-subj", "/CN=localhost", "-addext", "subjectAltName=DNS:localhost,IP:127.0.0.1",
+         "-keyout", keyfile, "-out", certfile],
+        check=True, capture_output=True,
+    )
+    return certfile, keyfile
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Answers every POST with {"status": true}. Subclass and override handle_post for more."""
+    protocol_version = "HTTP/1.1"  # keep-alive
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length)
+        self.server.bytes_received += length
+        status, payload = self.handle_post(body)
+        self.send_json(status, payload)
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def handle_post(self, body):
+        return 200, {"status": True}
+
+    def send_json(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInServer(ThreadingHTTPServer):
+    """Counts accepted connections; over TLS each one is a full handshake"""
+    daemon_threads = True
+
+    def __init__(self, handler_class=StandInHandler, tls=False):
+        super().__init__(("127.0.0.1", 0), handler_class)
+        self.connections = 0
+        self.bytes_received = 0
+        self.certfile = None
+        self.tempdir = None
+        if tls:
+            self.tempdir = tempfile.TemporaryDirectory()
+            self.certfile, keyfile = self_signed_cert(self.tempdir.name)
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(self.certfile, keyfile)
+            self.socket = context.wrap_socket(self.socket, server_side=True)
+        scheme = "https" if tls else "http"
+        self.base_url = f"{scheme}://localhost:{self.server_address[1]}"
+
+    def get_request(self):
+        request = super().get_request()
+        self.connections += 1
+        return request
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, name="stand-in-server", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self.tempdir is not None:
+            self.tempdir.cleanup()
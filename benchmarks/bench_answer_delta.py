@@ -0,0 +1,91 @@
+"""
+Bytes sent per save for a long essay, full uploads versus delta saves.
+
+Simulates a candidate writing a ~5,000-word answer with autosave: each save
+appends a paragraph, and every tenth one also rewrites a word in the middle.
+The same sequence is saved through final.save_question_answer to a local
+stand-in endpoint, once with full uploads and once with delta saves. The
+stand-in applies patches with final.apply_answer_patch and checks it ends
+up with the essay the candidate wrote.
+
+    python benchmarks/bench_answer_delta.py [--saves 100] [--words-per-save 50]
+"""
+import argparse
+import contextlib
+import io
+import json
+import random
+
+from _support import StandInHandler, StandInServer
+
+import final
+
+
+class SaveAnswerHandler(StandInHandler):
+    answers = {}
+    request_sizes = []
+
+    def handle_post(self, body):
+        self.request_sizes.append(len(body))
+        payload = json.loads(body)
+        question_id = payload["question_id"]
+        if "answer_patch" in payload:
+            try:
+                base = self.answers.get(question_id, "")
+                self.answers[question_id] = final.apply_answer_patch(base, payload["answer_patch"])
+            except ValueError:
+                return 409, {"code": "answer_patch_mismatch"}
+        else:
+            self.answers[question_id] = payload["provided_answer"]
+        return 200, {"status": True}
+
+
+def essay_revisions(saves, words_per_save, seed=3):
+    rng = random.Random(seed)
+    vocabulary = ["the", "exam", "process", "data", "result", "because", "model", "network",
+                  "therefore", "system", "analysis", "which", "shows", "value", "is", "and"]
+    words = []
+    for save in range(1, saves + 1):
+        words.extend(rng.choice(vocabulary) for _ in range(words_per_save))
+        if save % 10 == 0:
+            words[rng.randrange(len(words))] = "revised"
+        yield " ".join(words)
+
+
+def run(label, delta, revisions):
+    final.ANSWER_DELTA_SAVES = delta
+    SaveAnswerHandler.answers.clear()
+    SaveAnswerHandler.request_sizes.clear()
+    acknowledged = None
+    with contextlib.redirect_stdout(io.StringIO()):  # save_question_answer prints every payload
+        for text in revisions:
+            if final.save_question_answer("exam", "user", "q1", "1", text, "token", base_answer=acknowledged):
+                acknowledged = text
+    assert SaveAnswerHandler.answers["q1"] == revisions[-1], "server copy diverged"
+
+    sizes = SaveAnswerHandler.request_sizes
+    print(f"{label:<8} {len(revisions):>6} {len(sizes):>9} {sum(sizes) / 1024:>10.1f} "
+          f"{sum(sizes) / len(revisions):>14.0f} {sizes[-1]:>11}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--saves", type=int, default=100)
+    parser.add_argument("--words-per-save", type=int, default=50)
+    args = parser.parse_args()
+
+    revisions = list(essay_revisions(args.saves, args.words_per_save))
+    server = StandInServer(SaveAnswerHandler).start()
+    final.SAVE_ANSWER_URL = f"{server.base_url}/wp-json/api/v1/save-question-answer"
+    try:
+        print(f"final essay: {len(revisions[-1].split())} words, {len(revisions[-1])} characters")
+        print(f"{'mode':<8} {'saves':>6} {'requests':>9} {'total KiB':>10} {'bytes/save':>14} {'last save':>11}")
+        run("full", False, revisions)
+        run("delta", True, revisions)
+    finally:
+        final.api_client.close()
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+GUI event loop lag while network work runs in the background.
+
+Starts an offscreen QApplication with final.EventLoopLagMonitor and, for a
+fixed time, keeps the GUI thread busy the way an exam session does: answer
+saves queued through final.AnswerSaveQueue while the candidate types, and
+blocking api_client.post calls handed to final.gui_tasks with their results
+continued on the GUI thread. The local stand-in endpoint answers slowly, so
+any call that blocks or nests the event loop shows up as lag. Exits non-zero
+when p99 lag exceeds the frame budget.
+
+    python benchmarks/bench_event_loop_lag.py [--seconds 10] [--server-delay-ms 80] [--budget-ms 16]
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from _support import StandInHandler, StandInServer
+
+import final
+from PyQt6.QtCore import QTimer
+from PyQt6.QtWidgets import QApplication
+
+
+class SlowHandler(StandInHandler):
+    delay = 0.08
+
+    def handle_post(self, body):
+        time.sleep(self.delay)
+        return 200, {"status": True}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--server-delay-ms", type=float, default=80)
+    parser.add_argument("--budget-ms", type=float, default=16)
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    SlowHandler.delay = args.server_delay_ms / 1000
+    server = StandInServer(SlowHandler).start()
+    final.SAVE_ANSWER_URL = f"{server.base_url}/wp-json/api/v1/save-question-answer"
+    post_url = f"{server.base_url}/wp-json/api/v1/recorded-video"
+
+    monitor = final.EventLoopLagMonitor(interval_ms=5, report_every_s=args.seconds * 10)
+    save_queue = final.AnswerSaveQueue("exam", "user", "token")
+    completed = {"posts": 0, "errors": 0}
+    keystrokes = []
+
+    def on_posted(response):
+        completed["posts"] += 1
+
+    def on_error(error):
+        completed["errors"] += 1
+
+    def type_a_word():
+        keystrokes.append("word")
+        save_queue.enqueue(f"q{len(keystrokes) % 5}", "1", " ".join(keystrokes))
+
+    def post_in_background():
+        final.gui_tasks.run(final.api_client.post, post_url, json={"type": "still"},
+                            on_done=on_posted, on_error=on_error)
+
+    typing = QTimer()
+    typing.timeout.connect(type_a_word)
+    posting = QTimer()
+    posting.timeout.connect(post_in_background)
+
+    with contextlib.redirect_stdout(io.StringIO()):  # save_question_answer prints every payload
+        monitor.start()
+        typing.start(30)
+        posting.start(50)
+        QTimer.singleShot(int(args.seconds * 1000), app.quit)
+        app.exec()
+
+        typing.stop()
+        posting.stop()
+        stats = monitor.summary()
+        save_queue.stop()
+        save_queue.worker.join(30)
+    final.gui_tasks.shutdown()
+    final.api_client.close()
+    server.stop()
+
+    print(f"{args.seconds:.0f}s with a {args.server_delay_ms:.0f} ms endpoint: {len(keystrokes)} answer saves queued, "
+          f"{completed['posts']} background posts ({completed['errors']} errors), {server.connections} connections")
+    print(f"event loop lag over {stats['ticks']} ticks: p50 {stats['p50_ms']:.2f} ms, "
+          f"p99 {stats['p99_ms']:.2f} ms, max {stats['max_ms']:.2f} ms")
+    within = stats["p99_ms"] < args.budget_ms
+    print(f"p99 {'within' if within else 'OVER'} the {args.budget_ms:.0f} ms budget")
+    return 0 if within else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
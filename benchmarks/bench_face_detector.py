@@ -0,0 +1,91 @@
+"""
+Face detection latency over a folder of sample frames.
+
+Runs final.FaceDetectorService over every image in the folder, in name
+order as one frame stream, in three configurations:
+
+    full-res   every frame scanned at its own resolution (the old per-frame cascade)
+    downscaled every frame scanned after downscaling to detect_width
+    tracked    downscaled, searching around the last face with periodic full rescans
+
+and reports per-scan latency and how often each configuration found a face
+in the frames where the full-resolution scan found one.
+
+    python benchmarks/bench_face_detector.py FRAMES_DIR [--detect-width 320] [--repeat 1]
+"""
+import argparse
+import os
+import sys
+import time
+
+from _support import percentile
+
+import final
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".pgm")
+
+
+def load_frames(folder):
+    import cv2
+
+    frames = []
+    for name in sorted(os.listdir(folder)):
+        if not name.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        gray = cv2.imread(os.path.join(folder, name), cv2.IMREAD_GRAYSCALE)
+        if gray is None:
+            print(f"skipping unreadable {name}", file=sys.stderr)
+            continue
+        frames.append(gray)
+    return frames
+
+
+def run(label, detector, frames, repeat, use_track):
+    found = []
+    elapsed = []
+    for _ in range(repeat):
+        track = final.FaceTrack() if use_track else None
+        found = []
+        for gray in frames:
+            started = time.perf_counter()
+            faces = detector.detect(gray, track)
+            elapsed.append((time.perf_counter() - started) * 1000)
+            found.append(bool(faces))
+    return label, found, elapsed, detector.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("frames_dir")
+    parser.add_argument("--detect-width", type=int, default=320)
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    frames = load_frames(args.frames_dir)
+    if not frames:
+        sys.exit(f"no images in {args.frames_dir}")
+    if not final.FaceDetectorService().available():
+        sys.exit("OpenCV face cascade not available")
+    height, width = frames[0].shape
+    print(f"{len(frames)} frames ({width}x{height}), detect width {args.detect_width}, repeat {args.repeat}")
+
+    results = [
+        run("full-res", final.FaceDetectorService(detect_width=sys.maxsize), frames, args.repeat, use_track=False),
+        run("downscaled", final.FaceDetectorService(detect_width=args.detect_width), frames, args.repeat, use_track=False),
+        run("tracked", final.FaceDetectorService(detect_width=args.detect_width), frames, args.repeat, use_track=True),
+    ]
+
+    reference = results[0][1]
+    with_face = sum(reference)
+    print(f"{'config':<11} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'total s':>8} {'agree':>7} "
+          f"{'found':>7}  scans")
+    for label, found, elapsed, stats in results:
+        agree = sum(a == b for a, b in zip(found, reference)) / len(reference)
+        recall = sum(a and b for a, b in zip(found, reference)) / with_face if with_face else 1.0
+        scans = ", ".join(f"{scan} {s['count']}x p50 {s['p50_ms']}" for scan, s in stats.items())
+        print(f"{label:<11} {percentile(elapsed, 50):>8.2f} {percentile(elapsed, 95):>8.2f} {max(elapsed):>8.2f} "
+              f"{sum(elapsed) / 1000:>8.2f} {agree:>7.1%} {recall:>7.1%}  {scans}")
+
+
+if __name__ == "__main__":
+    main()
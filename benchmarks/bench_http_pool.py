@@ -0,0 +1,51 @@
+"""
+Handshake count and latency of bare requests.post versus the pooled api_client.
+
+Runs the same sequence of small JSON POSTs against a local HTTPS stand-in,
+first the way the API helpers used to call it (a new connection, and so a
+new TCP + TLS handshake, per call) and then through final.api_client.
+
+    python benchmarks/bench_http_pool.py [--requests 200]
+"""
+import argparse
+import time
+
+import requests
+
+from _support import StandInServer, percentile
+
+import final
+
+
+def run(label, post, server, count):
+    url = f"{server.base_url}/wp-json/api/v1/save-question-answer"
+    payload = {"exam_id": "1", "user_id": "1", "question_id": "1", "provided_answer": "A"}
+    connections_before = server.connections
+    latencies = []
+    for _ in range(count):
+        started = time.perf_counter()
+        response = post(url, json=payload, verify=server.certfile, timeout=10)
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - started)
+    handshakes = server.connections - connections_before
+    print(f"{label:<24} {count:>8} {handshakes:>11} {percentile(latencies, 50) * 1000:>9.2f} "
+          f"{percentile(latencies, 99) * 1000:>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    server = StandInServer(tls=True).start()
+    try:
+        print(f"{'client':<24} {'requests':>8} {'handshakes':>11} {'p50 ms':>9} {'p99 ms':>9}")
+        run("requests.post", requests.post, server, args.requests)
+        run("api_client.post", final.api_client.post, server, args.requests)
+    finally:
+        final.api_client.close()
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
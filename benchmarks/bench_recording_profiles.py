@@ -0,0 +1,207 @@
+"""
+CPU cost of recording at each profile, fed from a synthetic camera.
+
+The synthetic camera advertises a typical webcam format list. For each
+profile, final.select_camera_format picks the native format the way
+BackgroundWebcamRecorder.negotiate_camera_format does, and frames in that
+format are pushed at its frame rate through QVideoFrameInput into a
+QMediaRecorder configured as apply_profile would. Process CPU time over
+wall time gives the share of one core; the output size gives the bitrate.
+"fixed" is the old behaviour for comparison: the camera left at its default
+1280x720 format and the recorder asked for 640x480 @ 30 fps.
+
+The encoder is whatever the Qt multimedia backend provides for H.264
+(Media Foundation on Windows; LGPL FFmpeg builds fall back to MPEG-4 Part 2),
+so compare rows from one machine only. MJPEG camera formats are fed as
+already-decoded YUV420P, i.e. without the decode cost.
+
+    python benchmarks/bench_recording_profiles.py [--seconds 10] [--profiles low standard high]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+
+import _support  # noqa: F401 - puts the repository root on sys.path
+
+import final
+from PyQt6.QtCore import QSize, QTimer, QUrl
+from PyQt6.QtGui import QGuiApplication
+from PyQt6.QtMultimedia import (
+    QMediaCaptureSession,
+    QMediaFormat,
+    QMediaRecorder,
+    QVideoFrame,
+    QVideoFrameFormat,
+    QVideoFrameInput,
+)
+
+PixelFormat = QVideoFrameFormat.PixelFormat
+
+
+class SyntheticCameraFormat:
+    """The parts of QCameraFormat that select_camera_format reads"""
+    def __init__(self, width, height, fps, pixel_format):
+        self.size = QSize(width, height)
+        self.fps = fps
+        self.format = pixel_format
+
+    def isNull(self):
+        return False
+
+    def resolution(self):
+        return self.size
+
+    def maxFrameRate(self):
+        return self.fps
+
+    def pixelFormat(self):
+        return self.format
+
+    def __str__(self):
+        name = self.format.name.replace("Format_", "")
+        return f"{self.size.width()}x{self.size.height()}@{self.fps:.0f} {name}"
+
+
+# What a common USB webcam reports; the first entry is its default
+SYNTHETIC_CAMERA_FORMATS = [
+    SyntheticCameraFormat(1280, 720, 30, PixelFormat.Format_Jpeg),
+    SyntheticCameraFormat(640, 480, 30, PixelFormat.Format_Jpeg),
+    SyntheticCameraFormat(1280, 720, 10, PixelFormat.Format_YUYV),
+    SyntheticCameraFormat(640, 480, 30, PixelFormat.Format_YUYV),
+    SyntheticCameraFormat(640, 480, 30, PixelFormat.Format_NV12),
+    SyntheticCameraFormat(320, 240, 30, PixelFormat.Format_YUYV),
+    SyntheticCameraFormat(320, 240, 30, PixelFormat.Format_NV12),
+]
+
+
+def scene(width, height, index, rng):
+    """Luma of a webcam-like frame: smooth background, a moving head-sized blob, sensor noise"""
+    y, x = np.mgrid[0:height, 0:width]
+    luma = 60 + 80 * x / width + 40 * y / height
+    cx = width * (0.5 + 0.1 * np.sin(index / 7))
+    cy = height * (0.45 + 0.05 * np.cos(index / 5))
+    luma += 90 * (((x - cx) / (width * 0.18)) ** 2 + ((y - cy) / (height * 0.3)) ** 2 < 1)
+    luma += rng.normal(0, 3, luma.shape)
+    return np.clip(luma, 0, 255).astype(np.uint8)
+
+
+def synthetic_frame(pixel_format, luma, fps):
+    height, width = luma.shape
+    if pixel_format == PixelFormat.Format_NV12:
+        planes = [luma, np.full((height // 2, width), 128, np.uint8)]
+    elif pixel_format == PixelFormat.Format_YUYV:
+        packed = np.full((height, width * 2), 128, np.uint8)
+        packed[:, 0::2] = luma
+        planes = [packed]
+    else:
+        pixel_format = PixelFormat.Format_YUV420P  # decoded MJPEG
+        chroma = np.full((height // 2, width // 2), 128, np.uint8)
+        planes = [luma, chroma, chroma]
+
+    frame_format = QVideoFrameFormat(QSize(width, height), pixel_format)
+    frame_format.setStreamFrameRate(fps)
+    frame = QVideoFrame(frame_format)
+    frame.map(QVideoFrame.MapMode.WriteOnly)
+    for index, data in enumerate(planes):
+        stride = frame.bytesPerLine(index)
+        ptr = frame.bits(index)
+        ptr.setsize(frame.mappedBytes(index))
+        np.frombuffer(ptr, np.uint8)[:stride * data.shape[0]].reshape(data.shape[0], stride)[:, :data.shape[1]] = data
+    frame.unmap()
+    return frame
+
+
+def wait_until(app, condition, timeout_s=10):
+    deadline = time.monotonic() + timeout_s
+    poll = QTimer()
+    poll.timeout.connect(lambda: (condition() or time.monotonic() > deadline) and app.quit())
+    poll.start(10)
+    app.exec()
+    poll.stop()
+
+
+def record(app, camera_format, profile, resolution, fps, seconds, output):
+    """Record seconds of synthetic frames; returns (cpu share of one core, kbps, frames sent, frames refused)"""
+    rng = np.random.default_rng(0)
+    size = camera_format.resolution()
+    frames = [synthetic_frame(camera_format.pixelFormat(), scene(size.width(), size.height(), i, rng),
+                              camera_format.maxFrameRate())
+              for i in range(30)]
+
+    session = QMediaCaptureSession()
+    frame_input = QVideoFrameInput()
+    session.setVideoFrameInput(frame_input)
+    recorder = QMediaRecorder()
+    session.setRecorder(recorder)
+    media_format = QMediaFormat()
+    media_format.setFileFormat(QMediaFormat.FileFormat.MPEG4)
+    media_format.setVideoCodec(QMediaFormat.VideoCodec.H264)
+    recorder.setMediaFormat(media_format)
+    recorder.setQuality(profile["quality"])
+    recorder.setVideoResolution(QSize(*resolution))
+    recorder.setVideoFrameRate(fps)
+    recorder.setOutputLocation(QUrl.fromLocalFile(output))
+
+    counts = {"sent": 0, "refused": 0, "next": 0}
+    def deliver():
+        sent = frame_input.sendVideoFrame(frames[counts["next"] % len(frames)])
+        counts["next"] += 1
+        counts["sent" if sent else "refused"] += 1
+
+    # The camera delivers at its own frame rate whatever the recorder does
+    camera_clock = QTimer()
+    camera_clock.timeout.connect(deliver)
+    recorder.record()
+    wait_until(app, lambda: recorder.recorderState() == QMediaRecorder.RecorderState.RecordingState)
+    camera_clock.start(round(1000 / camera_format.maxFrameRate()))
+
+    cpu_started, wall_started = time.process_time(), time.monotonic()
+    wait_until(app, lambda: time.monotonic() - wall_started >= seconds, timeout_s=seconds + 1)
+    camera_clock.stop()
+    recorder.stop()
+    wait_until(app, lambda: recorder.recorderState() == QMediaRecorder.RecorderState.StoppedState)
+    cpu, wall = time.process_time() - cpu_started, time.monotonic() - wall_started
+
+    if recorder.error() != QMediaRecorder.Error.NoError:
+        raise RuntimeError(f"recorder error: {recorder.errorString()}")
+    kbps = os.path.getsize(output) * 8 / seconds / 1000
+    return cpu / wall, kbps, counts["sent"], counts["refused"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--profiles", nargs="+", default=["low", "standard", "high"])
+    args = parser.parse_args()
+
+    app = QGuiApplication(sys.argv)
+    runs = []
+    fixed = final.RECORDING_PROFILES[final.recording_profile_index("high")]
+    runs.append(("fixed", SYNTHETIC_CAMERA_FORMATS[0], fixed, (640, 480), 30.0))
+    for name in args.profiles:
+        profile = final.RECORDING_PROFILES[final.recording_profile_index(name)]
+        camera_format = final.select_camera_format(SYNTHETIC_CAMERA_FORMATS, profile["resolution"], profile["fps"])
+        size = camera_format.resolution()
+        # At the selected profile the recorder takes the camera's exact resolution
+        runs.append((name, camera_format, profile, (size.width(), size.height()),
+                     min(profile["fps"], camera_format.maxFrameRate())))
+
+    print(f"{args.seconds:.0f}s per profile, process CPU time over wall time")
+    print(f"{'profile':<9} {'camera format':<22} {'recorded':<14} {'CPU':>7} {'kbps':>7} {'frames':>7} {'refused':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for name, camera_format, profile, resolution, fps in runs:
+            output = os.path.join(directory, f"{name}.mp4")
+            cpu, kbps, sent, refused = record(app, camera_format, profile, resolution, fps, args.seconds, output)
+            recorded = f"{resolution[0]}x{resolution[1]}@{fps:.0f}"
+            print(f"{name:<9} {str(camera_format):<22} {recorded:<14} {cpu:>7.1%} {kbps:>7.0f} {sent:>7} {refused:>8}")
+    del app
+
+
+if __name__ == "__main__":
+    main()
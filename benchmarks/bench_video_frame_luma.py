@@ -0,0 +1,94 @@
+"""
+Grayscale thumbnail cost per camera frame: mapped luma versus toImage().
+
+Builds synthetic NV12 and YUYV QVideoFrames and times the two ways the face
+monitor can get its analysis thumbnail: final.luma_thumbnail, which reads
+the mapped Y samples through final.VideoFrameView, and the older path of
+frame.toImage() followed by final.qimage_gray_array.
+
+    python benchmarks/bench_video_frame_luma.py [--frames 100] [--width 160]
+"""
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+
+from _support import percentile
+
+import final
+from PyQt6.QtCore import QSize
+from PyQt6.QtGui import QGuiApplication
+from PyQt6.QtMultimedia import QVideoFrame, QVideoFrameFormat
+
+PixelFormat = QVideoFrameFormat.PixelFormat
+SIZES = [(640, 480), (1280, 720), (1920, 1080)]
+
+
+def synthetic_frame(pixel_format, width, height, seed):
+    """Random luma with flat chroma, written into a memory-backed frame"""
+    rng = np.random.default_rng(seed)
+    luma = rng.integers(0, 256, (height, width), np.uint8)
+    if pixel_format == PixelFormat.Format_NV12:
+        planes = [luma, np.full((height // 2, width), 128, np.uint8)]
+    else:
+        packed = np.full((height, width * 2), 128, np.uint8)
+        packed[:, 0::2] = luma
+        planes = [packed]
+
+    frame = QVideoFrame(QVideoFrameFormat(QSize(width, height), pixel_format))
+    frame.map(QVideoFrame.MapMode.WriteOnly)
+    for index, data in enumerate(planes):
+        stride = frame.bytesPerLine(index)
+        ptr = frame.bits(index)
+        ptr.setsize(frame.mappedBytes(index))
+        np.frombuffer(ptr, np.uint8)[:stride * data.shape[0]].reshape(data.shape[0], stride)[:, :data.shape[1]] = data
+    frame.unmap()
+    return frame
+
+
+def via_luma(frame, width):
+    return final.luma_thumbnail(frame, width)
+
+
+def via_image(frame, width):
+    image = frame.toImage()
+    height = max(1, round(image.height() * width / max(1, image.width())))
+    return final.qimage_gray_array(image, width, height)
+
+
+def timed(path, frame, width):
+    started = time.perf_counter()
+    path(frame, width)
+    return (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--width", type=int, default=160)
+    args = parser.parse_args()
+
+    app = QGuiApplication(sys.argv)
+    print(f"{args.frames} frames per size, thumbnail width {args.width}")
+    print(f"{'format':<6} {'size':>10} {'path':<8} {'p50 ms':>8} {'p99 ms':>8} {'speedup':>8}")
+    for pixel_format, name in [(PixelFormat.Format_NV12, "NV12"), (PixelFormat.Format_YUYV, "YUYV")]:
+        for width, height in SIZES:
+            # A fresh frame each time - QVideoFrame caches the image toImage() converted
+            luma_ms, image_ms = [], []
+            for seed in range(args.frames):
+                frame = synthetic_frame(pixel_format, width, height, seed)
+                luma_ms.append(timed(via_luma, frame, args.width))
+                image_ms.append(timed(via_image, frame, args.width))
+            for label, elapsed in (("toImage", image_ms), ("luma", luma_ms)):
+                speedup = percentile(image_ms, 50) / max(percentile(elapsed, 50), 1e-6)
+                print(f"{name:<6} {f'{width}x{height}':>10} {label:<8} {percentile(elapsed, 50):>8.3f} "
+                      f"{percentile(elapsed, 99):>8.3f} {speedup:>7.1f}x")
+    del app
+
+
+if __name__ == "__main__":
+    main()
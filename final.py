@@ -1,6 +1,7 @@
 # === Standard Library ===
 import ctypes
 from ctypes import wintypes
+import hashlib
 import json
 import logging
 import os
@@ -10,10 +11,15 @@ import sys
 import re
 import threading
 import time
+import uuid
 from datetime import datetime
 import types
+from contextlib import contextmanager
 import logging
 import logging.handlers
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
 import platform
 import subprocess
 from PyQt6 import QtCore, QtWidgets
@@ -22,6 +28,7 @@ import keyboard
 import numpy as np
 import psutil
 import requests
+from requests.adapters import HTTPAdapter
 import sounddevice as sd
 from PyQt6.QtCore import Qt, QTimer, pyqtSlot, QMetaObject, Q_ARG
 # === PyQt6 Core ===
@@ -37,12 +44,15 @@ from PyQt6.QtCore import (
     QUrl,
     QUrlQuery,
     QBuffer,QObject,
+    QThread,
+    pyqtSignal,
 )
 
 # === PyQt6 GUI ===
 from PyQt6.QtGui import (
     QColor,
     QFont,
+    QImage,
     QKeyEvent,
     QPainter,
     QPixmap,
@@ -85,7 +95,9 @@ from PyQt6.QtMultimedia import (
     QMediaCaptureSession,
     QMediaDevices,
     QMediaFormat,
-    QMediaRecorder,QVideoSink
+    QMediaRecorder,QVideoSink,
+    QVideoFrame,
+    QVideoFrameFormat
 )
 
 from PyQt6.QtMultimediaWidgets import QVideoWidget
@@ -1080,6 +1092,434 @@ def patched_eventFilter(self, obj, event):
             
     return super(MainWindow, self).eventFilter(obj, event)
 # -----------------------------------------------------------------------------
+# API Integration: Shared HTTP Client
+# -----------------------------------------------------------------------------
+# (connect, read) timeouts per endpoint, in seconds
+ENDPOINT_TIMEOUTS = {
+    "login": (5, 15),
+    "get-exam-details": (5, 10),
+    "get-question-from-id": (5, 10),
+    "save-question-answer": (5, 15),
+    "save-exam-recorded-video": (10, 120),
+    "start-recorded-video-upload": (5, 15),
+    "upload-recorded-video-block": (5, 30),
+    "save-proctoring-events": (5, 15),
+}
+DEFAULT_ENDPOINT_TIMEOUT = (5, 30)
+
+# Total budget across retries per endpoint, in seconds
+ENDPOINT_DEADLINES = {
+    "login": 30,
+    "get-exam-details": 30,
+    "get-question-from-id": 30,
+    "save-question-answer": 45,
+}
+DEFAULT_ENDPOINT_DEADLINE = 60
+
+class RequestCancelled(requests.RequestException):
+    """Raised when a retrying request is cancelled, e.g. because the user navigated away"""
+
+# Transmit priority classes, most urgent first
+PRIORITY_CRITICAL = 0     # answer saves, onstop notification
+PRIORITY_INTERACTIVE = 1  # login, exam details, question fetches
+PRIORITY_BULK = 2         # recorded video
+PRIORITY_NAMES = {PRIORITY_CRITICAL: "critical", PRIORITY_INTERACTIVE: "interactive", PRIORITY_BULK: "bulk"}
+
+ENDPOINT_PRIORITIES = {
+    "save-question-answer": PRIORITY_CRITICAL,
+    "save-exam-recorded-video": PRIORITY_BULK,
+    "start-recorded-video-upload": PRIORITY_BULK,
+    "upload-recorded-video-block": PRIORITY_BULK,
+}
+
+class TransmitScheduler:
+    """
+    Coordinates requests to the exam server by priority class.
+
+    Critical and interactive requests are admitted immediately. Bulk transfers
+    run one at a time and only while nothing more urgent is in flight; between
+    blocks they pause for newly arrived urgent requests and draw from a token
+    bucket that caps video upload bandwidth. Queue wait is tracked per class.
+    """
+    def __init__(self, bulk_rate_bps=1024 * 1024, bulk_burst_bytes=1024 * 1024, max_bulk_pause=10.0):
+        self.condition = threading.Condition()
+        self.urgent_active = 0
+        self.bulk_active = 0
+        self.max_bulk_pause = max_bulk_pause  # keep a paused upload inside the server's read timeout
+
+        # Token bucket for bulk bytes
+        self.bulk_rate_bps = bulk_rate_bps
+        self.bulk_burst_bytes = bulk_burst_bytes
+        self.tokens = bulk_burst_bytes
+        self.last_refill = time.monotonic()
+
+        self.waits = {priority: deque(maxlen=200) for priority in PRIORITY_NAMES}
+        self.admitted = {priority: 0 for priority in PRIORITY_NAMES}
+
+    def set_bulk_rate(self, bytes_per_second):
+        """Change the bulk bandwidth cap; None removes it"""
+        with self.condition:
+            self.bulk_rate_bps = bytes_per_second
+
+    @contextmanager
+    def slot(self, priority):
+        """Hold a transmit slot of the given class for the duration of one request"""
+        started = time.monotonic()
+        with self.condition:
+            if priority == PRIORITY_BULK:
+                self.condition.wait_for(lambda: self.urgent_active == 0 and self.bulk_active == 0)
+                self.bulk_active += 1
+            else:
+                self.urgent_active += 1
+            self.record_wait(priority, time.monotonic() - started)
+        try:
+            yield
+        finally:
+            with self.condition:
+                if priority == PRIORITY_BULK:
+                    self.bulk_active -= 1
+                else:
+                    self.urgent_active -= 1
+                self.condition.notify_all()
+
+    def pace_bulk(self, nbytes):
+        """Called by bulk transfers before each block: yield to urgent requests, then wait for tokens"""
+        started = time.monotonic()
+        with self.condition:
+            self.condition.wait_for(lambda: self.urgent_active == 0, self.max_bulk_pause)
+
+            delay = 0
+            if self.bulk_rate_bps:
+                now = time.monotonic()
+                self.tokens = min(self.bulk_burst_bytes, self.tokens + (now - self.last_refill) * self.bulk_rate_bps)
+                self.last_refill = now
+                self.tokens -= nbytes
+                if self.tokens < 0:
+                    delay = -self.tokens / self.bulk_rate_bps
+        if delay:
+            time.sleep(delay)
+
+        paused = time.monotonic() - started
+        if paused > 0.001:
+            with self.condition:
+                self.waits[PRIORITY_BULK].append(paused)
+
+    def record_wait(self, priority, seconds):
+        """Callers hold the condition"""
+        self.waits[priority].append(seconds)
+        self.admitted[priority] += 1
+        if self.admitted[priority] % 25 == 0:
+            logging.info(f"[TransmitScheduler] {self.format_stats(priority)}")
+
+    def format_stats(self, priority):
+        samples = sorted(self.waits[priority])
+        if not samples:
+            return f"{PRIORITY_NAMES[priority]}: no requests"
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+        return (f"{PRIORITY_NAMES[priority]}: {self.admitted[priority]} requests, queue wait "
+                f"mean {sum(samples) / len(samples) * 1000:.0f} ms, p95 {p95 * 1000:.0f} ms, "
+                f"max {samples[-1] * 1000:.0f} ms")
+
+    def stats(self):
+        with self.condition:
+            return [self.format_stats(priority) for priority in PRIORITY_NAMES]
+
+# Global scheduler shared by every request to the exam server
+transmit_scheduler = TransmitScheduler()
+
+class ApiClient:
+    """
+    Shared HTTP client for all stageevaluate API calls.
+
+    A single requests.Session keeps connections alive in a per-host pool, so
+    consecutive calls reuse an established TCP + TLS connection instead of
+    paying a fresh handshake on every request. Every call gets its endpoint's
+    timeout, and post_with_retry adds deadline-bounded retries and hedging.
+    """
+    def __init__(self, pool_connections=4, pool_maxsize=10):
+        self.session = requests.Session()
+        self.session.headers.update({"Connection": "keep-alive"})
+        self.configure_pool(pool_maxsize, pool_connections)
+        self.hedge_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="api-hedge")
+        self.latency_lock = threading.Lock()
+        self.latencies = {}  # endpoint -> recent successful latencies in seconds
+        self.default_hedge_delay = 1.5
+
+    def configure_pool(self, pool_maxsize, pool_connections=4):
+        """
+        Args:
+            pool_maxsize (int): Connections kept alive per host
+            pool_connections (int): Number of distinct hosts to keep pools for
+        """
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.pool_maxsize = pool_maxsize
+
+    @staticmethod
+    def endpoint_name(url):
+        return url.rstrip("/").rsplit("/", 1)[-1]
+
+    def timeout_for(self, endpoint):
+        return ENDPOINT_TIMEOUTS.get(endpoint, DEFAULT_ENDPOINT_TIMEOUT)
+
+    def hedge_delay(self, endpoint):
+        """p95 of recent latencies for the endpoint, or a default until enough samples exist"""
+        with self.latency_lock:
+            samples = sorted(self.latencies.get(endpoint, ()))
+        if len(samples) < 5:
+            return self.default_hedge_delay
+        return samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+
+    def priority_for(self, endpoint):
+        return ENDPOINT_PRIORITIES.get(endpoint, PRIORITY_INTERACTIVE)
+
+    def post(self, url, priority=None, **kwargs):
+        kwargs.setdefault("timeout", self.timeout_for(self.endpoint_name(url)))
+        return self._timed_post(url, kwargs, priority)
+
+    def _timed_post(self, url, kwargs, priority=None):
+        if priority is None:
+            priority = self.priority_for(self.endpoint_name(url))
+        with transmit_scheduler.slot(priority):
+            started = time.monotonic()
+            response = self.session.post(url, **kwargs)
+        with self.latency_lock:
+            samples = self.latencies.setdefault(self.endpoint_name(url), deque(maxlen=50))
+            samples.append(time.monotonic() - started)
+        return response
+
+    def _hedged_post(self, url, kwargs, cancel_event=None, priority=None):
+        """Send a second identical request if the first exceeds the endpoint's p95 latency"""
+        endpoint = self.endpoint_name(url)
+        delay = self.hedge_delay(endpoint)
+        futures = [self.hedge_pool.submit(self._timed_post, url, kwargs, priority)]
+        done, _ = wait(futures, timeout=delay)
+        if not done and not (cancel_event is not None and cancel_event.is_set()):
+            logging.info(f"[ApiClient] {endpoint} slower than {delay:.2f}s, sending hedged request")
+            futures.append(self.hedge_pool.submit(self._timed_post, url, kwargs, priority))
+
+        # First successful response wins; the slower one is left to finish in the background
+        last_error = None
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    return future.result()
+                except requests.RequestException as e:
+                    last_error = e
+        raise last_error
+
+    def post_with_retry(self, url, retries=3, hedge=False, cancel_event=None, backoff_base=0.5, priority=None, **kwargs):
+        """
+        POST with jittered exponential backoff inside the endpoint's deadline budget.
+
+        Args:
+            retries (int): Extra attempts after the first one
+            hedge (bool): Hedge each attempt - only for idempotent reads
+            cancel_event (threading.Event): Set it to abandon the remaining attempts
+            backoff_base (float): Base delay in seconds, doubled on every attempt
+            priority (int): Transmit class; defaults to the endpoint's class
+
+        Raises:
+            RequestCancelled: If cancel_event was set before the request completed
+        """
+        endpoint = self.endpoint_name(url)
+        deadline = time.monotonic() + ENDPOINT_DEADLINES.get(endpoint, DEFAULT_ENDPOINT_DEADLINE)
+        kwargs.setdefault("timeout", self.timeout_for(endpoint))
+
+        attempt = 0
+        while True:
+            if cancel_event is not None and cancel_event.is_set():
+                raise RequestCancelled(f"{endpoint} request cancelled")
+
+            response, error = None, None
+            try:
+                if hedge:
+                    response = self._hedged_post(url, kwargs, cancel_event, priority)
+                else:
+                    response = self._timed_post(url, kwargs, priority)
+                if response.status_code < 500:
+                    return response
+            except requests.RequestException as e:
+                error = e
+
+            attempt += 1
+            delay = random.uniform(0, backoff_base * (2 ** attempt))
+            if attempt > retries or time.monotonic() + delay >= deadline:
+                if error is not None:
+                    raise error
+                return response
+
+            logging.warning(f"[ApiClient] {endpoint} attempt {attempt} failed "
+                            f"({error or response.status_code}), retrying in {delay:.2f}s")
+            if cancel_event is not None:
+                if cancel_event.wait(delay):
+                    raise RequestCancelled(f"{endpoint} request cancelled")
+            else:
+                time.sleep(delay)
+
+    def head(self, url, **kwargs):
+        return self.session.head(url, **kwargs)
+
+    def close(self):
+        self.hedge_pool.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
+
+# Global shared client instance
+api_client = ApiClient()
+
+API_PROBE_URL = "https://stageevaluate.sentientgeeks.us/wp-json/"
+
+class ConnectivityMonitor(QObject):
+    """
+    Tracks whether the exam server is reachable.
+
+    A lightweight HEAD probe runs on a background thread every few seconds (more
+    often while offline). Workers can block on wait_online() and call probe()
+    directly after a failed request to confirm the link is down.
+    """
+    connectivity_changed = pyqtSignal(bool)
+
+    def __init__(self, probe_url=API_PROBE_URL, interval_ms=10000, offline_interval_ms=3000, parent=None):
+        super().__init__(parent)
+        self.probe_url = probe_url
+        self.interval_ms = interval_ms
+        self.offline_interval_ms = offline_interval_ms
+        self.online_event = threading.Event()
+        self.online_event.set()
+        self.probe_lock = threading.Lock()
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.schedule_probe)
+
+    def start(self):
+        self.timer.start(self.interval_ms)
+
+    def stop(self):
+        self.timer.stop()
+
+    def is_online(self):
+        return self.online_event.is_set()
+
+    def wait_online(self, timeout=None):
+        return self.online_event.wait(timeout)
+
+    def schedule_probe(self):
+        threading.Thread(target=self.probe, name="connectivity-probe", daemon=True).start()
+
+    def probe(self):
+        """Blocking reachability check. Any HTTP response counts as online."""
+        if not self.probe_lock.acquire(blocking=False):
+            # Another probe is already running - report the last known state
+            return self.is_online()
+        try:
+            api_client.head(self.probe_url, timeout=3)
+            online = True
+        except requests.RequestException:
+            online = False
+        finally:
+            self.probe_lock.release()
+        self.set_online(online)
+        return online
+
+    def set_online(self, online):
+        if online == self.is_online():
+            return
+        if online:
+            self.online_event.set()
+            logging.info("[ConnectivityMonitor] Server reachable again")
+        else:
+            self.online_event.clear()
+            logging.warning("[ConnectivityMonitor] Server unreachable, switching to offline mode")
+        self.connectivity_changed.emit(online)
+
+class GuiTaskRunner(QObject):
+    """
+    Runs blocking calls for the GUI on worker threads.
+
+    run() returns at once; when the call completes, on_done(result) or
+    on_error(exception) is invoked back on the GUI thread through a queued
+    signal. The event loop is never blocked or nested, so callers continue in
+    those callbacks and guard against the user acting again in the meantime.
+    """
+    task_finished = pyqtSignal(object, object, object)  # on_done, on_error, future
+
+    def __init__(self, max_workers=4, parent=None):
+        super().__init__(parent)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gui-offload")
+        self.task_finished.connect(self.deliver, Qt.ConnectionType.QueuedConnection)
+
+    def run(self, fn, *args, on_done=None, on_error=None, **kwargs):
+        future = self.executor.submit(fn, *args, **kwargs)
+        future.add_done_callback(lambda f: self.task_finished.emit(on_done, on_error, f))
+        return future
+
+    def deliver(self, on_done, on_error, future):
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            if on_error:
+                on_error(error)
+            else:
+                logging.error(f"[GuiTaskRunner] Background call failed: {error}")
+            return
+        if on_done:
+            on_done(future.result())
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+# Worker threads for blocking calls made on behalf of the GUI thread
+gui_tasks = GuiTaskRunner()
+
+class EventLoopLagMonitor(QObject):
+    """
+    Measures GUI event loop lag for debugging.
+
+    A fast timer compares when it actually fires with when it was due; the
+    worst and p99 lag over each reporting window are logged. Enable with the
+    EVALUATE_LAG_MONITOR=1 environment variable.
+    """
+    def __init__(self, interval_ms=5, report_every_s=10, parent=None):
+        super().__init__(parent)
+        self.interval_ms = interval_ms
+        self.report_every_s = report_every_s
+        self.samples = []
+        self.last_tick = None
+        self.window_start = time.monotonic()
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.timer.timeout.connect(self.tick)
+
+    def start(self):
+        self.last_tick = time.monotonic()
+        self.window_start = self.last_tick
+        self.timer.start(self.interval_ms)
+
+    def tick(self):
+        now = time.monotonic()
+        lag_ms = max(0.0, (now - self.last_tick) * 1000 - self.interval_ms)
+        self.samples.append(lag_ms)
+        self.last_tick = now
+
+        if now - self.window_start >= self.report_every_s:
+            stats = self.summary()
+            level = logging.WARNING if stats["max_ms"] > 16 else logging.INFO
+            logging.log(level, f"[EventLoopLag] {stats['ticks']} ticks, p50 {stats['p50_ms']:.1f} ms, "
+                               f"p99 {stats['p99_ms']:.1f} ms, max {stats['max_ms']:.1f} ms")
+            self.samples = []
+            self.window_start = now
+
+    def summary(self):
+        """Lag percentiles over the samples collected since the last report"""
+        samples = sorted(self.samples) or [0.0]
+        def pct(p):
+            return samples[min(len(samples) - 1, int(len(samples) * p))]
+        return {"ticks": len(self.samples), "p50_ms": pct(0.50), "p99_ms": pct(0.99), "max_ms": samples[-1]}
+
+# -----------------------------------------------------------------------------
 # API Integration: Login API
 # -----------------------------------------------------------------------------
 SESSION_TOKEN = None
@@ -1091,7 +1531,7 @@ def login_api(exam_code):
 
     try:
         logging.debug(f"🔹 Sending POST request to {url} with payload: {payload}")
-        response = requests.post(url, json=payload, headers=headers)
+        response = api_client.post(url, json=payload, headers=headers)
         logging.debug(f"📡 Response Status Code: {response.status_code}")
         logging.debug(f"📜 Response Content: {response.text}")
 
@@ -1117,7 +1557,7 @@ def get_exam_details(token, exam_code=None):
     data = {"exam_link": exam_code} if exam_code else {}
     
     try:
-        response = requests.post(url, headers=headers, json=data)
+        response = api_client.post_with_retry(url, hedge=True, headers=headers, json=data)
         logging.debug(f"Response Status Code: {response.status_code}")
         logging.debug(f"Response Content: {response.text}")
         response_json = response.json()
@@ -1133,7 +1573,7 @@ def get_exam_details(token, exam_code=None):
         print("\n⚠️ Error calling exam details API:", e)
         return None
 
-def fetch_question(question_id, exam_id, user_id, idx, first_request=False):
+def fetch_question(question_id, exam_id, user_id, idx, first_request=False, cancel_event=None):
     url = "https://stageevaluate.sentientgeeks.us/wp-json/api/v1/get-question-from-id"
     payload = {
         "question_id": str(question_id),
@@ -1149,7 +1589,7 @@ def fetch_question(question_id, exam_id, user_id, idx, first_request=False):
 
     try:
         logging.info(f"[fetch_question] Sending request: {payload}")
-        response = requests.post(url, json=payload, headers=headers)
+        response = api_client.post_with_retry(url, hedge=True, cancel_event=cancel_event, json=payload, headers=headers)
         logging.info(f"[fetch_question] Status Code: {response.status_code}")
 
         if response.status_code != 200:
@@ -1166,16 +1606,90 @@ def fetch_question(question_id, exam_id, user_id, idx, first_request=False):
             logging.warning(f"[fetch_question] No valid question returned for ID {question_id}")
             return None
 
+    except RequestCancelled:
+        logging.info(f"[fetch_question] Request for question {question_id} cancelled")
+        return None
     except Exception as e:
         logging.exception(f"[fetch_question] Exception: {e}")
         return None
 
 
 
-def save_question_answer(exam_id, user_id, question_id, question_type, answer, SESSION_TOKEN):
+SAVE_ANSWER_URL = "https://stageevaluate.sentientgeeks.us/wp-json/api/v1/save-question-answer"
+RECORDED_VIDEO_URL = "https://stageevaluate.sentientgeeks.us/wp-json/api/v1/save-exam-recorded-video"
+
+# Send descriptive/coding saves as a patch against the last acknowledged revision;
+# enable with EVALUATE_ANSWER_DELTA_SAVES=1. Requires server support; rejected
+# patches fall back to a full upload.
+ANSWER_DELTA_SAVES = os.environ.get("EVALUATE_ANSWER_DELTA_SAVES") == "1"
+
+def answer_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def make_answer_patch(base, target):
+    """
+    Build a single-splice patch turning base into target.
+
+    The common prefix and suffix are kept and only the span in between is sent,
+    which covers the usual case of typing in one place between saves.
+
+    start and end index base in Unicode code points (Python str indices), not
+    bytes; a PHP implementation has to splice with mb_substr(..., 'UTF-8'),
+    not substr. Both hashes are SHA-256 over the UTF-8 encoding.
+
+    Returns:
+        dict: The patch, or None if it would not be smaller than target itself
+    """
+    prefix = 0
+    max_prefix = min(len(base), len(target))
+    while prefix < max_prefix and base[prefix] == target[prefix]:
+        prefix += 1
+
+    suffix = 0
+    max_suffix = max_prefix - prefix
+    while suffix < max_suffix and base[len(base) - 1 - suffix] == target[len(target) - 1 - suffix]:
+        suffix += 1
+
+    patch = {
+        "base_hash": answer_hash(base),
+        "start": prefix,
+        "end": len(base) - suffix,
+        "text": target[prefix:len(target) - suffix],
+        "hash": answer_hash(target),
+    }
+    if len(json.dumps(patch)) >= len(json.dumps(target)):
+        return None
+    return patch
+
+def apply_answer_patch(base, patch):
+    """
+    Apply a patch from make_answer_patch, verifying both revisions.
+    This is the reference for the server side of delta saves.
+
+    Raises:
+        ValueError: If base is not the revision the patch was made against,
+            or the result does not match the expected hash
+    """
+    if answer_hash(base) != patch["base_hash"]:
+        raise ValueError("Answer patch base revision mismatch")
+    result = base[:patch["start"]] + patch["text"] + base[patch["end"]:]
+    if answer_hash(result) != patch["hash"]:
+        raise ValueError("Answer patch result hash mismatch")
+    return result
+
+def answer_patch_rejected(response):
+    """Whether the server refused a delta save and wants the full answer"""
+    if response.status_code == 409:
+        return True
+    try:
+        return response.json().get("code") == "answer_patch_mismatch"
+    except ValueError:
+        return False
+
+def save_question_answer(exam_id, user_id, question_id, question_type, answer, SESSION_TOKEN, base_answer=None):
     """
     Save a question answer to the API.
-    
+
     Args:
         exam_id (str): The ID of the exam
         user_id (str): The ID of the user
@@ -1183,14 +1697,13 @@ def save_question_answer(exam_id, user_id, question_id, question_type, answer, S
         question_type (str): The type of question (1, 2, 3, or 4)
         answer: The user's answer (format depends on question type)
         session_token (str): The authentication token
-        
+        base_answer (str): Last formatted answer the server acknowledged, used
+            as the base revision for delta saves
+
     Returns:
         dict: The API response as a dictionary, or None if the request failed
     """
     try:
-        import json  # Make sure to import json
-        import requests  # Make sure requests is imported
-        
         # Debug information
         print(f"DEBUG - Saving answer with parameters:")
         print(f"  exam_id: {exam_id}")
@@ -1222,14 +1735,28 @@ def save_question_answer(exam_id, user_id, question_id, question_type, answer, S
             "Content-Type": "application/json"
         }
         
+        # Descriptive and coding answers can go out as a patch against the acknowledged revision
+        patch = None
+        if ANSWER_DELTA_SAVES and base_answer is not None and question_type in ("1", "4"):
+            patch = make_answer_patch(base_answer, formatted_answer)
+        if patch is not None:
+            del payload["provided_answer"]
+            payload["answer_patch"] = patch
+
         print(f"DEBUG - API Payload: {payload}")
-        
+
         # Make the API request
-        response = requests.post(
-            "https://stageevaluate.sentientgeeks.us/wp-json/api/v1/save-question-answer",
-            json=payload,
-            headers=headers
-        )
+        url = SAVE_ANSWER_URL
+        logging.info(f"[save_question_answer] Sending {len(json.dumps(payload))} bytes "
+                     f"({'patch' if patch else 'full'}) for question {question_id}")
+        response = api_client.post(url, json=payload, headers=headers)
+
+        if patch is not None and answer_patch_rejected(response):
+            print(f"Answer patch rejected for question {question_id}, falling back to full upload")
+            del payload["answer_patch"]
+            payload["provided_answer"] = formatted_answer
+            logging.info(f"[save_question_answer] Sending {len(json.dumps(payload))} bytes (full) for question {question_id}")
+            response = api_client.post(url, json=payload, headers=headers)
         
         # Check if request was successful
         if response.status_code in (200, 201):
@@ -1345,6 +1872,138 @@ def check_video():
     # All checks passed
     return "OK"
 
+def load_face_cascade():
+    """
+    Load OpenCV's frontal face cascade, bundled or from the OpenCV install.
+
+    Returns:
+        cv2.CascadeClassifier: The classifier, or None if OpenCV or the model is unavailable
+    """
+    try:
+        import cv2
+    except ImportError:
+        logging.error("OpenCV (cv2) library not installed")
+        return None
+
+    if getattr(sys, 'frozen', False):
+        base_dir = sys._MEIPASS
+    else:
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+
+    cascade_paths = [
+        os.path.join(base_dir, 'haarcascade_frontalface_default.xml'),
+        cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
+    ]
+    for cascade_path in cascade_paths:
+        if os.path.exists(cascade_path):
+            face_cascade = cv2.CascadeClassifier(cascade_path)
+            if not face_cascade.empty():
+                return face_cascade
+    logging.error("Failed to load face cascade classifier from any location")
+    return None
+
+class FaceTrack:
+    """Where the last face was in one frame stream, so the next detection can search near it"""
+    def __init__(self):
+        self.box = None  # (x, y, w, h) in detection coordinates
+        self.since_full_scan = 0
+        self.last_scan_full = True
+
+class FaceDetectorService:
+    """
+    Process-wide face detector.
+
+    The cascade is loaded once, on first use. Frames are downscaled to
+    detect_width before detection. Given a FaceTrack, later frames are only
+    searched in a region around the last face, with a full-frame rescan every
+    rescan_every detections (and whenever the region comes up empty) so new
+    faces are still found. Detection latency is recorded per scan type.
+    """
+    def __init__(self, detect_width=320, roi_margin=0.75, rescan_every=5):
+        self.detect_width = detect_width
+        self.roi_margin = roi_margin
+        self.rescan_every = rescan_every
+        self.lock = threading.Lock()
+        self.face_cascade = None
+        self.load_attempted = False
+        self.latencies = {"full": deque(maxlen=500), "roi": deque(maxlen=500)}
+
+    def available(self):
+        with self.lock:
+            if not self.load_attempted:
+                self.load_attempted = True
+                self.face_cascade = load_face_cascade()
+                if self.face_cascade is not None:
+                    logging.info("Face cascade classifier loaded")
+            return self.face_cascade is not None
+
+    def detect(self, gray, track=None):
+        """
+        Find faces in a grayscale uint8 image.
+
+        Returns:
+            list: (x, y, w, h) boxes in the coordinates of gray
+        """
+        if not self.available():
+            return []
+        import cv2
+
+        scale = 1.0
+        if gray.shape[1] > self.detect_width:
+            scale = self.detect_width / gray.shape[1]
+            size = (self.detect_width, max(1, round(gray.shape[0] * scale)))
+            gray = cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+
+        faces = []
+        full_scan = True
+        if track is not None and track.box is not None and track.since_full_scan < self.rescan_every:
+            faces = self.detect_region(gray, track.box)
+            track.since_full_scan += 1
+            full_scan = False
+        if not faces:
+            faces = self.run_cascade(gray, "full")
+            full_scan = True
+
+        if track is not None:
+            track.box = max(faces, key=lambda f: f[2] * f[3]) if faces else None
+            track.last_scan_full = full_scan
+            if full_scan:
+                track.since_full_scan = 0
+        return [tuple(int(round(v / scale)) for v in face) for face in faces]
+
+    def detect_region(self, gray, box):
+        x, y, w, h = box
+        margin_x, margin_y = int(w * self.roi_margin), int(h * self.roi_margin)
+        x0, y0 = max(0, x - margin_x), max(0, y - margin_y)
+        x1, y1 = min(gray.shape[1], x + w + margin_x), min(gray.shape[0], y + h + margin_y)
+        faces = self.run_cascade(gray[y0:y1, x0:x1], "roi")
+        return [(fx + x0, fy + y0, fw, fh) for fx, fy, fw, fh in faces]
+
+    def run_cascade(self, gray, scan):
+        started = time.perf_counter()
+        with self.lock:
+            faces = self.face_cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(20, 20))
+        self.latencies[scan].append(time.perf_counter() - started)
+        return [tuple(int(v) for v in face) for face in faces]
+
+    def stats(self):
+        """Detection latency in milliseconds per scan type"""
+        stats = {}
+        for scan, samples in self.latencies.items():
+            samples = sorted(samples)
+            if not samples:
+                continue
+            stats[scan] = {
+                "count": len(samples),
+                "p50_ms": round(samples[len(samples) // 2] * 1000, 1),
+                "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 1),
+                "max_ms": round(samples[-1] * 1000, 1),
+            }
+        return stats
+
+# Global detector shared by the system check and the in-exam monitor
+face_detector = FaceDetectorService()
+
 def check_face_visible():
     """
     Checks if a face is visible in the camera feed.
@@ -1355,97 +2014,67 @@ def check_face_visible():
     - A working camera
     """
     try:
-        import cv2
-        import numpy as np
-        import logging
-        import os
-        import sys
-        
         logging.info("Starting face detection check...")
+
+        # The detector loads its model once per process
+        if not face_detector.available():
+            return "Failed (Face detection model not found)"
         
-        # Initialize the camera (default camera index 0)
-        cap = cv2.VideoCapture(0)
-        
-        # Check if camera opened successfully
-        if not cap.isOpened():
+        # Frames come from the camera broker, so the check uses the selected camera
+        latest_frame = deque(maxlen=1)
+        frame_arrived = threading.Event()
+        def on_frame(frame):
+            latest_frame.append(frame)
+            frame_arrived.set()
+
+        subscription = shared_camera.subscribe(on_frame, max_fps=10, direct=True, name="face-check")
+        if subscription is None:
             logging.error("Failed to open camera for face detection")
             return "Failed (Cannot access camera)"
         
-        # Set a timeout for face detection (3 seconds)
+        # Set a timeout for face detection (3 seconds of frames, plus camera start-up)
         max_attempts = 30  # At 10 FPS = 3 seconds
-        attempts = 0
+        deadline = time.monotonic() + 6.0
         face_detected = False
         
-        # Load the face detector - determine correct path for both dev and packaged environments
-        try:
-            # Get the base directory for resources
-            if getattr(sys, 'frozen', False):
-                # If the application is running as a bundled executable
-                base_dir = sys._MEIPASS
-            else:
-                # If running in a normal Python environment
-                base_dir = os.path.dirname(os.path.abspath(__file__))
-            
-            # Try multiple possible cascade file locations
-            cascade_paths = [
-                os.path.join(base_dir, 'haarcascade_frontalface_default.xml'),  # Bundled with executable
-                cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'   # Standard OpenCV location
-            ]
-            
-            face_cascade = None
-            for cascade_path in cascade_paths:
-                logging.info(f"Trying cascade file at: {cascade_path}")
-                if os.path.exists(cascade_path):
-                    logging.info(f"Found cascade file at: {cascade_path}")
-                    face_cascade = cv2.CascadeClassifier(cascade_path)
-                    if not face_cascade.empty():
-                        logging.info("Face cascade classifier loaded successfully")
-                        break
-            
-            if face_cascade is None or face_cascade.empty():
-                logging.error("Failed to load face cascade classifier from any location")
-                cap.release()
-                return "Failed (Face detection model not found)"
-                
-        except Exception as e:
-            logging.error(f"Failed to load face cascade classifier: {str(e)}")
-            cap.release()
-            return f"Failed (Cannot load face detection model: {str(e)})"
-        
         # Try to detect a face with multiple attempts
-        while attempts < max_attempts and not face_detected:
-            # Capture frame
-            ret, frame = cap.read()
-            if not ret:
-                logging.error("Failed to capture frame from camera")
-                break
-                
-            # Convert to grayscale for face detection
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            
-            # Detect faces
-            faces = face_cascade.detectMultiScale(
-                gray,
-                scaleFactor=1.1,
-                minNeighbors=5,
-                minSize=(30, 30),
-                flags=cv2.CASCADE_SCALE_IMAGE
-            )
-            
-            # Check if any faces are detected
-            if len(faces) > 0:
-                face_detected = True
-                logging.info(f"Face detected! Found {len(faces)} face(s)")
+        attempt = 0
+        try:
+            while attempt < max_attempts and time.monotonic() < deadline:
+                # Wait for the next frame
+                if not frame_arrived.wait(timeout=0.5):
+                    continue
+                frame_arrived.clear()
+                try:
+                    frame = latest_frame.pop()
+                except IndexError:
+                    continue
+                attempt += 1
+                    
+                # Convert to grayscale for face detection, straight from the luma plane when possible
+                gray = luma_thumbnail(frame, face_detector.detect_width)
+                if gray is None:
+                    image = frame.toImage()
+                    if image.isNull():
+                        continue
+                    gray = qimage_gray_array(image, image.width(), image.height())
                 
-                # Log face dimensions and position for debugging
-                for (x, y, w, h) in faces:
-                    logging.info(f"Face at position: x={x}, y={y}, width={w}, height={h}")
-                break
+                # Detect faces on a downscaled copy of the frame
+                faces = face_detector.detect(gray)
                 
-            attempts += 1
-            
-        # Release the camera
-        cap.release()
+                # Check if any faces are detected
+                if faces:
+                    face_detected = True
+                    logging.info(f"Face detected! Found {len(faces)} face(s)")
+                    
+                    # Log face dimensions and position for debugging
+                    for (x, y, w, h) in faces:
+                        logging.info(f"Face at position: x={x}, y={y}, width={w}, height={h}")
+                    break
+        finally:
+            # Release the camera
+            subscription.cancel()
+        logging.info(f"Face detection latency: {face_detector.stats()}")
         
         # Return result based on face detection
         if face_detected:
@@ -1454,9 +2083,6 @@ def check_face_visible():
             logging.warning("No face detected in camera feed")
             return "Failed (No face detected in camera feed)"
             
-    except ImportError:
-        logging.error("OpenCV (cv2) library not installed")
-        return "Failed (OpenCV library not installed)"
     except Exception as e:
         error_msg = str(e)
         logging.error(f"Face detection error: {error_msg}")
@@ -1673,6 +2299,7 @@ class ExamCodePage(QWidget):
     def __init__(self, switch_to_system_check_callback):
         super().__init__()
         self.switch_to_system_check_callback = switch_to_system_check_callback
+        self.login_in_progress = False
         self.setup_ui()
 
     def setup_ui(self):
@@ -1794,21 +2421,39 @@ class ExamCodePage(QWidget):
     def handle_exam_code(self):
         exam_code = self.exam_code_edit.text().strip()
         if exam_code:
-            token = login_api(exam_code)
-            if token:
-                print("\n✅ Token generated:", token)
-                logging.info(f"Exam code entered and login successful: {exam_code}")
-                exam_details = get_exam_details(token, exam_code)
-                if exam_details:
-                    print("\n✅ Exam Details received in ExamCodePage:", exam_details)
-                    self.switch_to_system_check_callback(exam_code, token, exam_details)
-                else:
-                    print("\n❌ Exam details API call failed.")
-            else:
-                logging.warning("❌ Login failed. Please check your exam code or your network connection.")
+            # Login and exam details run in the background; a second click waits for them
+            if self.login_in_progress:
+                return
+            self.login_in_progress = True
+            gui_tasks.run(login_api, exam_code,
+                          on_done=lambda token: self.on_login_finished(exam_code, token),
+                          on_error=self.on_login_error)
         else:
             logging.warning("⚠️ Exam code cannot be empty.")
 
+    def on_login_finished(self, exam_code, token):
+        if token:
+            print("\n✅ Token generated:", token)
+            logging.info(f"Exam code entered and login successful: {exam_code}")
+            gui_tasks.run(get_exam_details, token, exam_code,
+                          on_done=lambda exam_details: self.on_exam_details_received(exam_code, token, exam_details),
+                          on_error=self.on_login_error)
+        else:
+            self.login_in_progress = False
+            logging.warning("❌ Login failed. Please check your exam code or your network connection.")
+
+    def on_exam_details_received(self, exam_code, token, exam_details):
+        self.login_in_progress = False
+        if exam_details:
+            print("\n✅ Exam Details received in ExamCodePage:", exam_details)
+            self.switch_to_system_check_callback(exam_code, token, exam_details)
+        else:
+            print("\n❌ Exam details API call failed.")
+
+    def on_login_error(self, error):
+        self.login_in_progress = False
+        logging.error(f"Login request failed: {error}")
+
 # 2. System Check Page
 class SystemCheckPage(QWidget):
     def __init__(self, switch_to_instructions_callback):
@@ -2028,62 +2673,1295 @@ class SystemCheckPage(QWidget):
     def on_continue(self):
         self.switch_to_instructions_callback()
         
-class SharedCameraSession:
+class CameraThreadInvoker(QObject):
+    """Runs callables on the camera thread on behalf of CameraBroker"""
+    call_queued = pyqtSignal(object)
+    call_blocking = pyqtSignal(object)
+
     def __init__(self):
+        super().__init__()
+        self.call_queued.connect(self.call, Qt.ConnectionType.QueuedConnection)
+        self.call_blocking.connect(self.call, Qt.ConnectionType.BlockingQueuedConnection)
+
+    @pyqtSlot(object)
+    def call(self, fn):
+        fn()
+
+
+class FrameSubscription(QObject):
+    """
+    One consumer of CameraBroker frames.
+
+    Frames above max_fps are dropped before anything else happens. Direct
+    subscriptions are called on the camera thread and must return quickly.
+    The others are delivered on the thread that subscribed, which needs an
+    event loop, and drop_policy decides what happens while a frame is still
+    queued or being handled: "latest" keeps only the newest frame for when
+    the subscriber is free, "skip" drops new frames until then.
+    """
+    frame_ready = pyqtSignal()
+
+    def __init__(self, broker, callback, max_fps=None, drop_policy="latest", direct=False, name=None):
+        super().__init__()
+        if drop_policy not in ("latest", "skip"):
+            raise ValueError(f"Unknown drop policy: {drop_policy}")
+        self.broker = broker
+        self.callback = callback
+        self.min_interval = 1.0 / max_fps if max_fps else 0.0
+        self.drop_policy = drop_policy
+        self.direct = direct
+        self.name = name or getattr(callback, "__qualname__", "subscriber")
+        self.active = True
+        self.lock = threading.Lock()
+        self.last_accepted = 0.0
+        self.pending = None
+        self.scheduled = False
+        self.busy = False
+
+        # Metrics
+        self.delivered = 0
+        self.dropped_rate = 0
+        self.dropped_busy = 0
+
+        self.frame_ready.connect(self.deliver, Qt.ConnectionType.QueuedConnection)
+
+    def offer(self, frame, now):
+        """Called on the camera thread for every frame"""
+        if not self.active:
+            return
+        if now - self.last_accepted < self.min_interval:
+            self.dropped_rate += 1
+            return
+        self.last_accepted = now
+
+        if self.direct:
+            self.delivered += 1
+            self.callback(frame)
+            return
+
+        with self.lock:
+            if self.drop_policy == "skip" and (self.scheduled or self.busy):
+                self.dropped_busy += 1
+                return
+            if self.pending is not None:
+                self.dropped_busy += 1
+            self.pending = frame
+            if self.scheduled or self.busy:
+                return
+            self.scheduled = True
+        self.frame_ready.emit()
+
+    @pyqtSlot()
+    def deliver(self):
+        with self.lock:
+            frame, self.pending = self.pending, None
+            self.scheduled = False
+            if frame is None or not self.active:
+                return
+            self.busy = True
+        try:
+            self.delivered += 1
+            self.callback(frame)
+        finally:
+            with self.lock:
+                self.busy = False
+                reschedule = self.pending is not None and not self.scheduled
+                if reschedule:
+                    self.scheduled = True
+            if reschedule:
+                self.frame_ready.emit()
+
+    def stats(self):
+        return {
+            "name": self.name,
+            "delivered": self.delivered,
+            "dropped_rate": self.dropped_rate,
+            "dropped_busy": self.dropped_busy,
+        }
+
+    def cancel(self):
+        if not self.active:
+            return
+        with self.lock:
+            self.active = False
+            self.pending = None
+        self.broker.unsubscribe(self)
+
+
+class CameraBroker:
+    """
+    Owns the camera for the lifetime of the app and fans its frames out.
+
+    The QCamera, capture session and video sink are created once, on a
+    dedicated "camera" thread that the recorder joins so it can share the
+    session. Anyone needing the camera holds it with acquire()/release() or
+    by subscribing; it is stopped idle_stop_ms after the last hold goes, and
+    reopening reuses the same objects. The device picked in
+    DeviceSelectionDialog is used by the system check and the exam alike;
+    the device preview shows a candidate with preview_device() without
+    changing that selection.
+    """
+    def __init__(self, idle_stop_ms=10000):
+        self.idle_stop_ms = idle_stop_ms
+        self.device = None
+        self.previewing = None  # shown instead of the selection while a preview is open
         self.camera = None
         self.capture_session = None
-        self.is_initialized = False
-        
-    def initialize(self, camera_device):
-        if self.is_initialized:
-            return True
+        self.video_sink = None
+        self.idle_timer = None
+        self.holds = 0
+        self.lock = threading.Lock()
+        self.subscriptions = []
+        self.thread = None
+        self.invoker = None
+
+    def ensure_thread(self):
+        """The camera thread, started on first use"""
+        with self.lock:
+            if self.thread is None:
+                self.thread = QThread()
+                self.thread.setObjectName("camera")
+                self.invoker = CameraThreadInvoker()
+                self.invoker.moveToThread(self.thread)
+                self.thread.start()
+            return self.thread
+
+    def run(self, fn, blocking=True):
+        """Run fn on the camera thread; blocking calls return its result or re-raise"""
+        thread = self.ensure_thread()
+        if QThread.currentThread() == thread:
+            return fn()
+        if not blocking:
+            self.invoker.call_queued.emit(fn)
+            return None
 
-        self.camera = QCamera(camera_device)
-        self.capture_session = QMediaCaptureSession()
-        self.capture_session.setCamera(self.camera)
-        self.is_initialized = True
-        return True
-        
-    def get_session(self):
-        return self.capture_session
-        
-    def start_camera(self):
-        if self.camera and self.is_initialized:
+        outcome = {}
+        def call():
+            try:
+                outcome["result"] = fn()
+            except Exception as e:
+                outcome["error"] = e
+        self.invoker.call_blocking.emit(call)
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome.get("result")
+
+    def select_device(self, camera_device):
+        """Use camera_device from now on, switching an open camera over to it"""
+        if camera_device is None:
+            return
+        self.device = camera_device
+        logging.info(f"[CameraBroker] Selected camera: {camera_device.description()}")
+        if self.camera is not None:
+            self.run(self._switch_device)
+
+    def preview_device(self, camera_device):
+        """
+        Open camera_device for a preview without making it the selection.
+        Pass None when the preview closes to go back to the selected camera.
+        """
+        self.previewing = camera_device
+        if camera_device is not None:
+            logging.info(f"[CameraBroker] Previewing camera: {camera_device.description()}")
+        if self.camera is not None:
+            self.run(self._switch_device)
+
+    def current_device(self):
+        """The previewed or selected camera if it is still connected, otherwise the first one"""
+        available = QMediaDevices.videoInputs()
+        wanted = self.previewing if self.previewing is not None else self.device
+        if wanted is not None:
+            for camera_device in available:
+                if camera_device.id() == wanted.id():
+                    return camera_device
+            logging.warning(f"[CameraBroker] Selected camera {wanted.description()} "
+                            f"is not connected, using the first available")
+        return available[0] if available else None
+
+    def acquire(self):
+        """Hold the camera open; returns False if there is no camera to open"""
+        return self.run(self._acquire)
+
+    def release(self):
+        self.run(self._release, blocking=False)
+
+    def subscribe(self, callback, max_fps=None, drop_policy="latest", direct=False, name=None):
+        """
+        Start delivering frames to callback. See FrameSubscription for the
+        delivery options. Returns the subscription, or None if the camera
+        could not be opened; cancel() it when done.
+        """
+        subscription = FrameSubscription(self, callback, max_fps, drop_policy, direct, name)
+        if not self.acquire():
+            return None
+        self.run(self._attach_sink)
+        with self.lock:
+            self.subscriptions.append(subscription)
+        logging.info(f"[CameraBroker] {subscription.name} subscribed "
+                     f"(max_fps={max_fps}, {'direct' if direct else drop_policy})")
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            if subscription not in self.subscriptions:
+                return
+            self.subscriptions.remove(subscription)
+        stats = subscription.stats()
+        logging.info(f"[CameraBroker] {stats['name']} unsubscribed: {stats['delivered']} delivered, "
+                     f"{stats['dropped_rate']} over its rate cap, {stats['dropped_busy']} dropped while busy")
+        self.release()
+
+    def stats(self):
+        with self.lock:
+            return [subscription.stats() for subscription in self.subscriptions]
+
+    def shutdown(self):
+        """Stop the camera and its thread at application exit"""
+        if self.thread is None or not self.thread.isRunning():
+            return
+        self.run(self._shutdown)
+        self.thread.quit()
+        self.thread.wait(3000)
+
+    # Camera thread only
+    def _acquire(self):
+        if self.camera is None:
+            camera_device = self.current_device()
+            if camera_device is None:
+                logging.error("[CameraBroker] No camera available")
+                return False
+            self.camera = QCamera(camera_device)
+            self.capture_session = QMediaCaptureSession()
+            self.capture_session.setCamera(self.camera)
+            self.idle_timer = QTimer()
+            self.idle_timer.setSingleShot(True)
+            self.idle_timer.timeout.connect(self._stop_if_idle)
+            logging.info(f"[CameraBroker] Opened camera: {camera_device.description()}")
+
+        self.holds += 1
+        self.idle_timer.stop()
+        if not self.camera.isActive():
             self.camera.start()
-            return True
-        return False
-            
-    def stop_camera(self):
-        if self.camera and self.is_initialized:
+        return True
+
+    def _release(self):
+        self.holds = max(0, self.holds - 1)
+        if self.holds == 0 and self.idle_timer is not None:
+            self.idle_timer.start(self.idle_stop_ms)
+
+    def _stop_if_idle(self):
+        if self.holds == 0 and self.camera is not None:
+            logging.info("[CameraBroker] No users left, stopping camera")
             self.camera.stop()
-            return True
+
+    def _switch_device(self):
+        camera_device = self.current_device()
+        if camera_device is not None and camera_device.id() != self.camera.cameraDevice().id():
+            logging.info(f"[CameraBroker] Switching camera to {camera_device.description()}")
+            self.camera.setCameraDevice(camera_device)
+
+    def _attach_sink(self):
+        # Created on first subscription, so frames are only pulled when someone wants them
+        if self.video_sink is None:
+            self.video_sink = QVideoSink()
+            self.capture_session.setVideoSink(self.video_sink)
+            self.video_sink.videoFrameChanged.connect(self._dispatch_frame)
+
+    def _dispatch_frame(self, frame):
+        now = time.monotonic()
+        with self.lock:
+            subscriptions = list(self.subscriptions)
+        for subscription in subscriptions:
+            try:
+                subscription.offer(frame, now)
+            except Exception as e:
+                logging.error(f"[CameraBroker] Frame subscriber {subscription.name} failed: {e}")
+
+    def _shutdown(self):
+        if self.idle_timer is not None:
+            self.idle_timer.stop()
+        if self.camera is not None:
+            self.camera.stop()
+
+# Global camera broker instance
+shared_camera = CameraBroker()
+
+# "video" records continuous H.264 chunks; "stills" uploads sampled frames for slow links
+PROCTORING_MODE = os.environ.get("EVALUATE_PROCTORING_MODE", "video")
+STILL_FRAME_INTERVAL_MS = int(os.environ.get("EVALUATE_STILL_INTERVAL_MS", "2000"))
+
+def qimage_gray_array(image, width, height):
+    """Downscale a QImage to width x height grayscale and return it as a uint8 array"""
+    small = image.scaled(
+        width, height, Qt.AspectRatioMode.IgnoreAspectRatio, Qt.TransformationMode.FastTransformation
+    ).convertToFormat(QImage.Format.Format_Grayscale8)
+    ptr = small.constBits()
+    ptr.setsize(small.sizeInBytes())
+    return np.frombuffer(ptr, np.uint8).reshape(height, small.bytesPerLine())[:, :width].copy()
+
+# Pixel formats whose first plane is 8-bit luma, one byte per pixel
+LUMA_PLANE_FORMATS = {
+    QVideoFrameFormat.PixelFormat.Format_NV12,
+    QVideoFrameFormat.PixelFormat.Format_NV21,
+    QVideoFrameFormat.PixelFormat.Format_YUV420P,
+    QVideoFrameFormat.PixelFormat.Format_YUV422P,
+    QVideoFrameFormat.PixelFormat.Format_YV12,
+    QVideoFrameFormat.PixelFormat.Format_IMC1,
+    QVideoFrameFormat.PixelFormat.Format_IMC2,
+    QVideoFrameFormat.PixelFormat.Format_IMC3,
+    QVideoFrameFormat.PixelFormat.Format_IMC4,
+    QVideoFrameFormat.PixelFormat.Format_Y8,
+}
+
+# Formats where luma is every Nth byte: (offset of the Y byte, bytes per pixel).
+# 16-bit formats are little-endian, so their high byte is the 8-bit luma.
+LUMA_STRIDED_FORMATS = {
+    QVideoFrameFormat.PixelFormat.Format_YUYV: (0, 2),
+    QVideoFrameFormat.PixelFormat.Format_UYVY: (1, 2),
+    QVideoFrameFormat.PixelFormat.Format_AYUV: (1, 4),
+    QVideoFrameFormat.PixelFormat.Format_Y16: (1, 2),
+    QVideoFrameFormat.PixelFormat.Format_P010: (1, 2),
+    QVideoFrameFormat.PixelFormat.Format_P016: (1, 2),
+}
+
+class VideoFrameView:
+    """
+    Maps a QVideoFrame and exposes its luma as a NumPy view without copying.
+
+    Planar and semi-planar YUV formats give the Y plane as is; packed and
+    16-bit formats give a strided view of it. The view is only valid inside
+    the with block, while the frame is mapped, so copy whatever has to outlive
+    it. luma() returns None for RGB formats - use toImage() for those.
+
+        with VideoFrameView(frame) as view:
+            gray = view.luma()
+    """
+    def __init__(self, frame):
+        self.frame = frame
+        self.mapped = False
+
+    def __enter__(self):
+        self.mapped = self.frame.isValid() and self.frame.map(QVideoFrame.MapMode.ReadOnly)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.mapped:
+            self.frame.unmap()
+            self.mapped = False
         return False
 
-# Global shared session instance
-shared_camera = SharedCameraSession()
+    def luma(self):
+        if not self.mapped:
+            return None
+        pixel_format = self.frame.pixelFormat()
+        if pixel_format in LUMA_PLANE_FORMATS:
+            offset, step = 0, 1
+        elif pixel_format in LUMA_STRIDED_FORMATS:
+            offset, step = LUMA_STRIDED_FORMATS[pixel_format]
+        else:
+            return None
+
+        width, height = self.frame.width(), self.frame.height()
+        stride = self.frame.bytesPerLine(0)
+        ptr = self.frame.bits(0)
+        ptr.setsize(self.frame.mappedBytes(0))
+        plane = np.frombuffer(ptr, np.uint8)[:stride * height].reshape(height, stride)
+        plane.flags.writeable = False
 
+        luma = plane[:, offset:offset + width * step:step]
+        if self.frame.surfaceFormat().scanLineDirection() == QVideoFrameFormat.Direction.BottomToTop:
+            luma = luma[::-1]
+        return luma
 
-class BackgroundWebcamRecorder:
-    def __init__(self, token=None, exam_code=None, user_id=None, exam_id=None):
+def luma_thumbnail(frame, width):
+    """
+    Grayscale thumbnail about width pixels wide, subsampled straight from the
+    frame's luma. Only the thumbnail is copied. None if the format has no luma.
+    """
+    with VideoFrameView(frame) as view:
+        luma = view.luma()
+        if luma is None:
+            return None
+        step = max(1, luma.shape[1] // width)
+        return np.ascontiguousarray(luma[::step, ::step])
+
+def average_hash(image, size=16):
+    """Cheap perceptual hash: a size x size grayscale thumbnail thresholded at its mean"""
+    pixels = qimage_gray_array(image, size, size)
+    return pixels > pixels.mean()
+
+def encode_jpeg(image, quality):
+    buffer = QBuffer()
+    buffer.open(QBuffer.OpenModeFlag.WriteOnly)
+    image.save(buffer, "JPEG", quality)
+    return bytes(buffer.data())
+
+class StillFrameSampler:
+    """
+    Low-bandwidth alternative to BackgroundWebcamRecorder that uploads stills.
+
+    One frame is sampled from the shared camera every interval_ms. Frames whose
+    average hash is within duplicate_bits of the last kept frame are skipped,
+    though one frame always goes out every keepalive_ms. Kept frames are
+    JPEG-encoded on a worker thread and uploaded in batches to the recorded
+    video endpoint; batches that cannot be sent wait in memory (oldest dropped
+    first). Offers the recorder's start/stop/flush interface.
+    """
+    def __init__(self, token=None, user_id=None, exam_id=None, connectivity=None,
+                 interval_ms=STILL_FRAME_INTERVAL_MS, batch_size=5, jpeg_quality=70,
+                 duplicate_bits=10, keepalive_ms=30000, max_backlog=5):
         self.token = token
-        self.exam_code = exam_code
         self.user_id = user_id if user_id is not None else "default_user"
         self.exam_id = exam_id if exam_id is not None else "default_exam"
-        self.recorder = None
-        self.recording_dir = "exam_recordings"
-        self.ensure_recording_dir()
-        self.chunk_timer = QTimer()
-        self.chunk_timer.timeout.connect(self.handle_chunk_timer)
-        self.chunk_interval = 10000  # 10 seconds in milliseconds
-        self.current_chunk_file = None
-        self.chunk_counter = 0
-        self.api_endpoint = "https://stageevaluate.sentientgeeks.us/wp-json/api/v1/save-exam-recorded-video"
+        self.connectivity = connectivity
+        self.interval_ms = interval_ms
+        self.batch_size = batch_size
+        self.jpeg_quality = jpeg_quality
+        self.duplicate_bits = duplicate_bits
+        self.keepalive_ms = keepalive_ms
+        self.max_backlog = max_backlog
+        self.api_endpoint = RECORDED_VIDEO_URL
+
+        self.camera_session = None
+        self.subscription = None
+        self.active = False
+        self.worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="still-frames")
+        self.lock = threading.Lock()
+        self.backlog = 0  # samples handed to the worker and not yet processed
+
+        # Worker thread state
+        self.last_hash = None
+        self.last_kept_ms = 0
+        self.batch = []  # (epoch ms, JPEG bytes)
+        self.unsent_batches = deque(maxlen=20)
+        self.batch_counter = 0
+        self.frames_sampled = 0
+        self.frames_skipped = 0
+        self.frames_uploaded = 0
+
+    def setup_recorder(self, camera_session):
+        self.subscription = self.subscribe(camera_session)
+        if self.subscription is not None:
+            self.camera_session = camera_session
+        return self.subscription is not None
+
+    def subscribe(self, camera_session):
+        # The broker caps delivery at one frame per interval
+        return camera_session.subscribe(
+            self.on_frame, max_fps=1000 / self.interval_ms, direct=True, name="still-frames"
+        )
 
+    def is_ready(self):
+        return self.camera_session is not None
 
-    
-    def ensure_recording_dir(self):
-        try:
-            if not os.path.exists(self.recording_dir):
+    def status(self):
+        return {
+            "state": "recording" if self.active else "stopped",
+            "mode": "stills",
+            "frames_sampled": self.frames_sampled,
+            "frames_skipped": self.frames_skipped,
+            "frames_uploaded": self.frames_uploaded,
+            "unsent_batches": len(self.unsent_batches),
+        }
+
+    def start_recording(self):
+        if not self.is_ready() or self.active:
+            return False
+        # Stopping released the camera; hold it again for a restart
+        if self.subscription is None:
+            self.subscription = self.subscribe(self.camera_session)
+            if self.subscription is None:
+                return False
+        self.active = True
+        logging.info(f"Still frame sampling started, one frame every {self.interval_ms} ms")
+        return True
+
+    def stop_recording(self):
+        if not self.active:
+            return False
+        self.active = False
+        if self.subscription is not None:
+            self.subscription.cancel()
+            self.subscription = None
+        self.worker.submit(self.send_batch)
+        logging.info(f"Still frame sampling stopped: {self.frames_sampled} sampled, "
+                     f"{self.frames_skipped} skipped as duplicates, {self.frames_uploaded} uploaded")
+        return True
+
+    def on_frame(self, frame):
+        if not self.active:
+            return
+        now_ms = int(time.time() * 1000)
+        with self.lock:
+            # The worker is behind, e.g. on a stalled upload - skip this sample
+            if self.backlog >= self.max_backlog:
+                return
+            self.backlog += 1
+
+        image = frame.toImage()
+        if image.isNull():
+            with self.lock:
+                self.backlog -= 1
+            return
+        self.worker.submit(self.process_sample, image, now_ms)
+
+    def process_sample(self, image, timestamp_ms):
+        try:
+            self.frames_sampled += 1
+            frame_hash = average_hash(image)
+            if (self.last_hash is not None and timestamp_ms - self.last_kept_ms < self.keepalive_ms
+                    and np.count_nonzero(frame_hash != self.last_hash) <= self.duplicate_bits):
+                self.frames_skipped += 1
+                return
+
+            self.last_hash = frame_hash
+            self.last_kept_ms = timestamp_ms
+            self.batch.append((timestamp_ms, encode_jpeg(image, self.jpeg_quality)))
+            if len(self.batch) >= self.batch_size:
+                self.send_batch()
+        except Exception as e:
+            logging.error(f"Error processing still frame: {e}")
+        finally:
+            with self.lock:
+                self.backlog -= 1
+
+    def send_batch(self):
+        """Close the current batch and upload everything waiting, in order. Runs on the worker."""
+        if self.batch:
+            self.unsent_batches.append((self.batch_counter, self.batch))
+            self.batch_counter += 1
+            self.batch = []
+
+        while self.unsent_batches:
+            if self.connectivity is not None and not self.connectivity.is_online():
+                return False
+            index, frames = self.unsent_batches[0]
+            if not self.upload_batch(index, frames):
+                return False
+            self.unsent_batches.popleft()
+            self.frames_uploaded += len(frames)
+        return True
+
+    def upload_batch(self, index, frames):
+        file_id = f"{self.user_id}-{self.exam_id}"
+        files = [
+            ('exam_id', (None, str(self.exam_id))),
+            ('user_id', (None, str(self.user_id))),
+            ('type', (None, 'stills')),
+            ('file_name', (None, file_id)),
+            ('chunk_number', (None, f"stills{index:04d}")),
+            ('frame_timestamps', (None, json.dumps([timestamp for timestamp, _ in frames]))),
+        ]
+        files += [('frames[]', (f"{file_id}_{timestamp}.jpg", data, 'image/jpeg')) for timestamp, data in frames]
+
+        try:
+            response = api_client.post(
+                self.api_endpoint,
+                files=files,
+                headers={'Authorization': f'Bearer {self.token}'}
+            )
+        except requests.RequestException as e:
+            logging.error(f"Request error uploading still frame batch {index}: {e}")
+            return False
+
+        if response.status_code == 200:
+            try:
+                if response.json().get('status') is True:
+                    logging.info(f"Uploaded still frame batch {index} ({len(frames)} frames, "
+                                 f"{sum(len(data) for _, data in frames)} bytes)")
+                    return True
+            except ValueError:
+                logging.error("Could not parse still frame upload response as JSON")
+                return False
+        logging.error(f"Failed to upload still frame batch {index}: {response.status_code} {response.text}")
+        return False
+
+    def chunk_manifest(self):
+        # Still frame batches are not sequenced video chunks
+        return []
+
+    def reconcile_missing_chunks(self, missing):
+        return list(missing)
+
+    def flush_uploads(self, timeout=None):
+        """Upload the partial batch and everything queued, e.g. before the onstop notification"""
+        try:
+            return self.worker.submit(self.send_batch).result(timeout)
+        except FutureTimeoutError:
+            logging.warning(f"Still frame uploads still pending after {timeout}s")
+            return False
+
+
+def file_sha256(path, block_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+class ChunkSpool:
+    """
+    Durable record of recorded chunks waiting for upload.
+
+    A JSON manifest next to the chunk files lists every pending chunk with its
+    sequence number and segment timing, and keeps the next sequence number so a
+    restarted app neither overwrites old files nor loses their uploads. A chunk
+    file is only deleted once the server has acknowledged it, or when the disk
+    quota forces the oldest chunks out. Acknowledged chunks stay listed (without
+    their file) so the whole exam can be described to the server at the end.
+    """
+    def __init__(self, directory, file_prefix, quota_bytes=500 * 1024 * 1024):
+        self.directory = directory
+        self.file_prefix = file_prefix
+        self.quota_bytes = quota_bytes
+        self.manifest_path = os.path.join(directory, f"{file_prefix}.spool.json")
+        self.lock = threading.Lock()
+        self.next_seq = 0
+        self.chunks = []  # pending chunk entries, oldest first
+        self.completed = []  # summaries of acknowledged chunks
+        self.evicted = 0
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+            self.next_seq = manifest.get("next_seq", 0)
+            self.chunks = [c for c in manifest.get("chunks", []) if os.path.exists(c["file"])]
+            self.completed = manifest.get("completed", [])
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logging.error(f"Could not read chunk spool manifest {self.manifest_path}: {e}")
+
+        # Adopt chunk files the manifest does not know about, e.g. after a crash
+        known = {c["seq"] for c in self.chunks}
+        pattern = re.compile(rf"^{re.escape(self.file_prefix)}_(\d+)\.mp4$")
+        for name in sorted(os.listdir(self.directory)):
+            match = pattern.match(name)
+            if not match:
+                continue
+            seq = int(match.group(1))
+            self.next_seq = max(self.next_seq, seq + 1)
+            path = os.path.abspath(os.path.join(self.directory, name))
+            if seq not in known and os.path.getsize(path) > 0:
+                self.chunks.append(self.make_entry(seq, path))
+                logging.warning(f"Adopted unlisted chunk {path} into the upload spool")
+
+        self.chunks.sort(key=lambda c: c["seq"])
+        if self.chunks:
+            logging.info(f"Resuming {len(self.chunks)} spooled chunk(s) from a previous run")
+        self.save()
+
+    @staticmethod
+    def make_entry(seq, chunk_file, segment=None):
+        segment = segment or {}
+        return {
+            "seq": seq,
+            "file": chunk_file,
+            "size": os.path.getsize(chunk_file) if os.path.exists(chunk_file) else 0,
+            "start_ms": segment.get("start_ms"),
+            "duration_ms": segment.get("duration_ms"),
+            "attempts": 0,
+            "upload_id": None,
+            "sha256": None,
+        }
+
+    @staticmethod
+    def summary(entry):
+        """What the server needs to verify a chunk: sequence, timing, size and hash"""
+        start_ms, duration_ms = entry.get("start_ms"), entry.get("duration_ms")
+        return {
+            "seq": entry["seq"],
+            "start_ms": start_ms,
+            "end_ms": start_ms + duration_ms if start_ms is not None and duration_ms is not None else None,
+            "size": entry["size"],
+            "sha256": entry.get("sha256"),
+        }
+
+    def save(self):
+        """Write the manifest atomically; callers hold the lock or own the spool"""
+        temp_path = self.manifest_path + ".tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"next_seq": self.next_seq, "chunks": self.chunks, "completed": self.completed}, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.manifest_path)
+        except OSError as e:
+            logging.error(f"Could not write chunk spool manifest: {e}")
+
+    def allocate_seq(self):
+        with self.lock:
+            seq = self.next_seq
+            self.next_seq += 1
+            self.save()
+            return seq
+
+    def add(self, seq, chunk_file, segment=None):
+        with self.lock:
+            self.chunks = [c for c in self.chunks if c["seq"] != seq]
+            self.chunks.append(self.make_entry(seq, chunk_file, segment))
+            self.chunks.sort(key=lambda c: c["seq"])
+            self.enforce_quota()
+            self.save()
+
+    def enforce_quota(self):
+        total = sum(c["size"] for c in self.chunks)
+        while self.chunks and total > self.quota_bytes:
+            oldest = self.chunks.pop(0)
+            total -= oldest["size"]
+            self.evicted += 1
+            try:
+                os.remove(oldest["file"])
+            except OSError:
+                pass
+            logging.error(f"Spool over quota ({self.quota_bytes} bytes), evicted chunk {oldest['seq']}")
+
+    def entry(self, seq):
+        with self.lock:
+            for entry in self.chunks:
+                if entry["seq"] == seq:
+                    return dict(entry)
+            return None
+
+    def pending(self):
+        with self.lock:
+            return [(c["file"], c["seq"]) for c in self.chunks]
+
+    def set_hash(self, seq, sha256):
+        with self.lock:
+            for entry in self.chunks:
+                if entry["seq"] == seq:
+                    entry["sha256"] = sha256
+                    self.save()
+                    return
+
+    def manifest(self):
+        """Every chunk of the exam, acknowledged or still pending, in sequence order"""
+        with self.lock:
+            entries = self.completed + [self.summary(c) for c in self.chunks]
+        return sorted(entries, key=lambda c: c["seq"])
+
+    def set_upload_id(self, seq, upload_id):
+        """Remember the server's upload session so a restart can resume it"""
+        with self.lock:
+            for entry in self.chunks:
+                if entry["seq"] == seq:
+                    entry["upload_id"] = upload_id
+                    self.save()
+                    return
+
+    def record_attempt(self, seq):
+        with self.lock:
+            for entry in self.chunks:
+                if entry["seq"] == seq:
+                    entry["attempts"] += 1
+                    self.save()
+                    return entry["attempts"]
+            return 0
+
+    def ack(self, seq):
+        """The server has the chunk - keep its summary and delete the file"""
+        self.remove(seq, completed=True)
+
+    def discard(self, seq):
+        """Drop a chunk that can never be uploaded (missing or empty file)"""
+        self.remove(seq, completed=False)
+
+    def remove(self, seq, completed):
+        with self.lock:
+            for entry in self.chunks:
+                if entry["seq"] == seq:
+                    self.chunks.remove(entry)
+                    if completed:
+                        self.completed.append(self.summary(entry))
+                    try:
+                        os.remove(entry["file"])
+                    except OSError as e:
+                        logging.warning(f"Could not delete chunk {entry['file']}: {e}")
+                    self.save()
+                    return
+
+    def is_pending(self, seq):
+        with self.lock:
+            return any(entry["seq"] == seq for entry in self.chunks)
+
+
+# Recording profiles from lowest to highest bitrate; nominal_kbps seeds the
+# estimate for profiles that have not been recorded yet
+RECORDING_PROFILES = [
+    {"name": "low", "resolution": (320, 240), "fps": 15.0,
+     "quality": QMediaRecorder.Quality.LowQuality, "nominal_kbps": 250},
+    {"name": "medium", "resolution": (480, 360), "fps": 20.0,
+     "quality": QMediaRecorder.Quality.NormalQuality, "nominal_kbps": 600},
+    {"name": "standard", "resolution": (640, 480), "fps": 24.0,
+     "quality": QMediaRecorder.Quality.NormalQuality, "nominal_kbps": 1000},
+    {"name": "high", "resolution": (640, 480), "fps": 30.0,
+     "quality": QMediaRecorder.Quality.HighQuality, "nominal_kbps": 1800},
+]
+
+# Recording profile to use unless the recorder is given one, e.g. "standard" on weak machines
+DEFAULT_RECORDING_PROFILE = os.environ.get("EVALUATE_RECORDING_PROFILE", "high")
+
+def recording_profile_index(name):
+    for index, profile in enumerate(RECORDING_PROFILES):
+        if profile["name"] == name:
+            return index
+    logging.warning(f"Unknown recording profile '{name}', using 'high'")
+    return len(RECORDING_PROFILES) - 1
+
+# Pixel formats the H.264 encoder takes without conversion, best first
+ENCODER_NATIVE_PIXEL_FORMATS = [
+    QVideoFrameFormat.PixelFormat.Format_NV12,
+    QVideoFrameFormat.PixelFormat.Format_YUV420P,
+]
+
+def select_camera_format(formats, resolution, fps):
+    """
+    Pick the camera's native format closest to a recording profile.
+
+    Cost grows with the scaling needed (upscaling counts double), with any
+    frame rate the format cannot reach, and with per-frame conversion:
+    MJPEG needs a decode, packed YUV and RGB a pixel-format conversion.
+
+    Returns:
+        QCameraFormat: The best format, or None if the camera reports none
+    """
+    target_width, target_height = resolution
+
+    def cost(camera_format):
+        size = camera_format.resolution()
+        scale = abs(np.log((size.width() * size.height()) / (target_width * target_height)))
+        if size.width() < target_width:
+            scale *= 2
+        fps_shortfall = max(0.0, fps - camera_format.maxFrameRate()) / fps
+
+        pixel_format = camera_format.pixelFormat()
+        if pixel_format in ENCODER_NATIVE_PIXEL_FORMATS:
+            conversion = 0.1 * ENCODER_NATIVE_PIXEL_FORMATS.index(pixel_format)
+        elif pixel_format == QVideoFrameFormat.PixelFormat.Format_Jpeg:
+            conversion = 0.5
+        else:
+            conversion = 0.3
+        return scale + 2 * fps_shortfall + conversion
+
+    candidates = [f for f in formats if not f.isNull() and f.resolution().width() > 0]
+    return min(candidates, key=cost, default=None)
+
+class BandwidthEstimator:
+    """
+    Picks the recording profile for the next segment from measured uploads.
+
+    Upload throughput comes from real chunk upload timings and the bitrate of
+    each profile from the chunks it actually produced. A profile is kept only
+    while its chunk uploads in well under one chunk interval; stepping up needs
+    a wider margin and a few segments at the current profile to avoid flapping.
+    """
+    def __init__(self, headroom=0.7, step_up_margin=0.4, min_dwell=3):
+        self.headroom = headroom
+        self.step_up_margin = step_up_margin
+        self.min_dwell = min_dwell
+        self.lock = threading.Lock()
+        self.throughput_bps = None
+        self.profile_rates = {}  # profile name -> recorded bytes per second
+        self.segments_at_profile = 0
+
+    def record_upload(self, size, elapsed):
+        if size <= 0 or elapsed <= 0:
+            return
+        rate = size / elapsed
+        with self.lock:
+            self.throughput_bps = rate if self.throughput_bps is None else 0.7 * self.throughput_bps + 0.3 * rate
+
+    def record_segment(self, profile_name, size, duration_ms):
+        if size <= 0 or not duration_ms:
+            return
+        rate = size / (duration_ms / 1000)
+        with self.lock:
+            previous = self.profile_rates.get(profile_name)
+            self.profile_rates[profile_name] = rate if previous is None else 0.7 * previous + 0.3 * rate
+
+    def bytes_per_second(self, index):
+        profile = RECORDING_PROFILES[index]
+        with self.lock:
+            if profile["name"] in self.profile_rates:
+                return self.profile_rates[profile["name"]]
+            # Scale a measured profile by the nominal bitrate ratio
+            for other in RECORDING_PROFILES:
+                if other["name"] in self.profile_rates:
+                    return self.profile_rates[other["name"]] * profile["nominal_kbps"] / other["nominal_kbps"]
+        return profile["nominal_kbps"] * 1000 / 8
+
+    def predicted_upload_seconds(self, index, interval_s):
+        with self.lock:
+            throughput = self.throughput_bps
+        if not throughput:
+            return None
+        return self.bytes_per_second(index) * interval_s / throughput
+
+    def choose(self, current, interval_s, backlog=0, ceiling=None):
+        """
+        Args:
+            ceiling (int): Highest profile index allowed, e.g. the selected profile
+
+        Returns:
+            tuple: (profile index, reason) - reason is None when nothing changes
+        """
+        self.segments_at_profile += 1
+        predicted = self.predicted_upload_seconds(current, interval_s)
+        if predicted is None:
+            return current, None
+
+        if current > 0 and (predicted > self.headroom * interval_s or backlog > 2):
+            self.segments_at_profile = 0
+            return current - 1, f"upload {predicted:.1f}s per {interval_s:.0f}s chunk, backlog {backlog}"
+
+        if ceiling is None:
+            ceiling = len(RECORDING_PROFILES) - 1
+        if current < ceiling and backlog == 0 and self.segments_at_profile >= self.min_dwell:
+            predicted_up = self.predicted_upload_seconds(current + 1, interval_s)
+            if predicted_up < self.step_up_margin * interval_s:
+                self.segments_at_profile = 0
+                return current + 1, f"predicted upload {predicted_up:.1f}s per {interval_s:.0f}s chunk"
+
+        return current, None
+
+RESUMABLE_UPLOAD_START_URL = "https://stageevaluate.sentientgeeks.us/wp-json/api/v1/start-recorded-video-upload"
+RESUMABLE_UPLOAD_BLOCK_URL = "https://stageevaluate.sentientgeeks.us/wp-json/api/v1/upload-recorded-video-block"
+
+class MultipartFileStream:
+    """
+    multipart/form-data body that streams its file part from disk.
+
+    requests reads files= parts fully into memory; passed as data=, this is
+    read block by block while the connection sends it, with a known length.
+    """
+    def __init__(self, fields, file_field, file_name, file_path, content_type, block_size=64 * 1024):
+        self.boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+        self.file_path = file_path
+        self.file_size = os.path.getsize(file_path)
+        self.block_size = block_size
+
+        head = "".join(
+            f'--{self.boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'
+            for name, value in fields.items()
+        )
+        head += (f'--{self.boundary}\r\nContent-Disposition: form-data; name="{file_field}"; '
+                 f'filename="{file_name}"\r\nContent-Type: {content_type}\r\n\r\n')
+        self.head = head.encode("utf-8")
+        self.tail = f"\r\n--{self.boundary}--\r\n".encode("utf-8")
+        self.blocks = self._blocks()
+        self.buffer = b""
+
+    def __len__(self):
+        return len(self.head) + self.file_size + len(self.tail)
+
+    def _blocks(self):
+        yield self.head
+        with open(self.file_path, "rb") as f:
+            while True:
+                block = f.read(self.block_size)
+                if not block:
+                    break
+                transmit_scheduler.pace_bulk(len(block))
+                yield block
+        yield self.tail
+
+    def read(self, size=-1):
+        while size < 0 or len(self.buffer) < size:
+            try:
+                self.buffer += next(self.blocks)
+            except StopIteration:
+                break
+        if size < 0:
+            data, self.buffer = self.buffer, b""
+        else:
+            data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+class ResumableChunkUploader:
+    """
+    Uploads a chunk file in fixed-size blocks through an upload session.
+
+    The server hands out an upload id and reports how many bytes it already
+    holds, so after a dropped connection (or on the next run) the upload
+    continues from that offset instead of byte 0. Only one block is in
+    memory at a time.
+    """
+    def __init__(self, token, block_size=1024 * 1024):
+        self.token = token
+        self.block_size = block_size
+
+    def upload(self, chunk_file, fields, upload_id=None, on_session=None):
+        """
+        Upload chunk_file, resuming upload_id if given.
+
+        Args:
+            fields (dict): Chunk metadata sent when the session is opened
+            on_session (callable): Called with the upload id once the server assigns it
+
+        Returns:
+            bool: Whether the server acknowledged the whole file, or None if
+            the server does not support upload sessions
+        """
+        size = os.path.getsize(chunk_file)
+        headers = {'Authorization': f'Bearer {self.token}'}
+
+        # Open (or reopen) the session and learn the acknowledged offset
+        response = api_client.post(
+            RESUMABLE_UPLOAD_START_URL,
+            json={**fields, "size": size, "upload_id": upload_id},
+            headers=headers
+        )
+        if response.status_code in (404, 405, 501):
+            return None
+        if response.status_code != 200:
+            logging.error(f"Could not open upload session: {response.status_code} {response.text}")
+            return False
+        session = response.json()
+        upload_id = session.get("upload_id")
+        offset = int(session.get("offset", 0))
+        if not upload_id:
+            logging.error(f"Upload session response without upload id: {session}")
+            return False
+        if not 0 <= offset <= size:
+            logging.error(f"Upload {upload_id} session reports offset {offset} outside the {size}-byte file")
+            return False
+        if on_session:
+            on_session(upload_id)
+        if offset:
+            logging.info(f"Resuming upload {upload_id} of {chunk_file} at byte {offset}/{size}")
+
+        with open(chunk_file, "rb") as f:
+            while offset < size:
+                f.seek(offset)
+                block = f.read(self.block_size)
+                transmit_scheduler.pace_bulk(len(block))
+                response = api_client.post(
+                    RESUMABLE_UPLOAD_BLOCK_URL,
+                    data=block,
+                    headers={
+                        **headers,
+                        'Content-Type': 'application/octet-stream',
+                        'Upload-Id': upload_id,
+                        'Upload-Offset': str(offset),
+                    }
+                )
+
+                # The server holds a different offset - continue from its view
+                if response.status_code == 409:
+                    server_offset = int(response.json().get("offset", offset))
+                    if server_offset == offset:
+                        logging.error(f"Upload {upload_id} rejected block at {offset}: {response.text}")
+                        return False
+                    if not 0 <= server_offset <= size:
+                        logging.error(f"Upload {upload_id} server offset {server_offset} is outside the {size}-byte file")
+                        return False
+                    offset = server_offset
+                    continue
+
+                if response.status_code != 200:
+                    logging.error(f"Upload {upload_id} block at {offset} failed: {response.status_code}")
+                    return False
+
+                new_offset = int(response.json().get("offset", offset + len(block)))
+                if new_offset <= offset:
+                    logging.error(f"Upload {upload_id} made no progress at byte {offset}")
+                    return False
+                if new_offset > size:
+                    logging.error(f"Upload {upload_id} server acknowledged {new_offset} bytes of a {size}-byte file")
+                    return False
+                offset = new_offset
+
+        logging.info(f"Upload {upload_id} complete ({size} bytes)")
+        return True
+
+class ChunkUploadWorker:
+    """
+    Uploads spooled recording chunks in order on a background thread.
+
+    The recorder hands each chunk over and immediately starts the next one.
+    Failed uploads are retried with capped exponential backoff without letting
+    later chunks overtake, and while the server is unreachable the worker holds
+    the queue and resumes in order on reconnect.
+    """
+    def __init__(self, upload_fn, spool, connectivity=None, estimator=None, max_backoff=60.0):
+        self.upload_fn = upload_fn
+        self.spool = spool
+        self.connectivity = connectivity
+        self.estimator = estimator
+        self.max_backoff = max_backoff
+        self.queue = deque(spool.pending())
+        self.in_flight = None
+        self.running = True
+        self.condition = threading.Condition()
+
+        # Metrics
+        self.chunks_uploaded = 0
+        self.bytes_uploaded = 0
+        self.failed_uploads = 0
+        self.last_upload_seconds = None
+        self.throughput_bps = None  # exponentially weighted bytes per second
+
+        self.worker = threading.Thread(target=self._run, name="chunk-upload", daemon=True)
+        self.worker.start()
+
+    def submit(self, chunk_file, chunk_index, segment=None):
+        # Persist first so the chunk survives a crash before it is uploaded
+        self.spool.add(chunk_index, chunk_file, segment)
+        with self.condition:
+            self.queue.append((chunk_file, chunk_index))
+            self.condition.notify_all()
+        return True
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while self.running and not self.queue:
+                    self.condition.wait()
+                if not self.queue:
+                    return
+
+            if self.connectivity and not self.connectivity.wait_online(timeout=1.0):
+                continue
+
+            with self.condition:
+                chunk_file, chunk_index = self.queue.popleft()
+                self.in_flight = (chunk_file, chunk_index)
+
+            # Evicted by the quota, or nothing usable was recorded
+            entry = self.spool.entry(chunk_index)
+            if entry is None or not os.path.exists(chunk_file) or os.path.getsize(chunk_file) == 0:
+                logging.warning(f"Dropping chunk {chunk_index} from the upload queue: {chunk_file}")
+                self.spool.discard(chunk_index)
+                with self.condition:
+                    self.in_flight = None
+                    self.condition.notify_all()
+                continue
+
+            # The content hash lets the server recognise a retried chunk it already holds
+            if entry.get("sha256") is None:
+                self.spool.set_hash(chunk_index, file_sha256(chunk_file))
+
+            size = os.path.getsize(chunk_file)
+            started = time.monotonic()
+            success = self.upload_fn(chunk_file, chunk_index)
+            elapsed = time.monotonic() - started
+
+            # A dropped link puts the chunk back at the front to keep the order
+            offline = not success and self.connectivity is not None and not self.connectivity.probe()
+
+            backoff = 0
+            if success:
+                self.spool.ack(chunk_index)
+            elif not offline:
+                attempts = self.spool.record_attempt(chunk_index)
+                backoff = random.uniform(0.5, 1.0) * min(self.max_backoff, 2 ** attempts)
+                logging.warning(f"Upload of chunk {chunk_index} failed (attempt {attempts}), retrying in {backoff:.1f}s")
+
+            with self.condition:
+                self.in_flight = None
+                if success:
+                    self.record_upload(size, elapsed)
+                else:
+                    if not offline:
+                        self.failed_uploads += 1
+                    self.queue.appendleft((chunk_file, chunk_index))
+                self.condition.notify_all()
+
+            if success:
+                if self.estimator is not None:
+                    self.estimator.record_upload(size, elapsed)
+                logging.info(f"Chunk upload metrics: {self.metrics()}")
+            elif backoff:
+                with self.condition:
+                    # Stopped - the chunk stays spooled for the next run
+                    if self.condition.wait_for(lambda: not self.running, backoff):
+                        return
+
+    def record_upload(self, size, elapsed):
+        self.chunks_uploaded += 1
+        self.bytes_uploaded += size
+        self.last_upload_seconds = elapsed
+        if elapsed > 0:
+            rate = size / elapsed
+            self.throughput_bps = rate if self.throughput_bps is None else 0.7 * self.throughput_bps + 0.3 * rate
+
+    def metrics(self):
+        with self.condition:
+            return {
+                "queue_depth": len(self.queue) + (1 if self.in_flight else 0),
+                "chunks_uploaded": self.chunks_uploaded,
+                "bytes_uploaded": self.bytes_uploaded,
+                "failed_uploads": self.failed_uploads,
+                "evicted_chunks": self.spool.evicted,
+                "last_upload_seconds": self.last_upload_seconds,
+                "throughput_bps": self.throughput_bps,
+            }
+
+    def flush(self, timeout=None):
+        """Block until every queued chunk has been uploaded. Returns False on timeout."""
+        with self.condition:
+            return self.condition.wait_for(
+                lambda: not self.running or (not self.queue and self.in_flight is None), timeout
+            )
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+
+
+class BackgroundWebcamRecorder:
+    def __init__(self, token=None, exam_code=None, user_id=None, exam_id=None, connectivity=None, profile=None):
+        self.token = token
+        self.connectivity = connectivity
+        self.exam_code = exam_code
+        self.user_id = user_id if user_id is not None else "default_user"
+        self.exam_id = exam_id if exam_id is not None else "default_exam"
+        self.recorder = None
+        self.recording_dir = "exam_recordings"
+        self.ensure_recording_dir()
+
+        # Chunks survive restarts in the spool; numbering continues where the last run stopped
+        self.spool = ChunkSpool(self.recording_dir, f"{self.user_id}-{self.exam_id}")
+        self.bandwidth = BandwidthEstimator()
+        self.upload_worker = ChunkUploadWorker(
+            self.upload_chunk, self.spool, connectivity=connectivity, estimator=self.bandwidth
+        )
+        self.resumable_uploader = ResumableChunkUploader(token)
+        self.resumable_supported = True  # cleared once the server turns out not to offer upload sessions
+        self.current_chunk_spooled = False
+        self.chunk_timer = QTimer()
+        self.chunk_timer.timeout.connect(self.handle_chunk_timer)
+        self.chunk_interval = 10000  # 10 seconds in milliseconds
+        self.current_chunk_file = None
+        self.chunk_counter = self.spool.next_seq
+        self.api_endpoint = RECORDED_VIDEO_URL
+
+        # Segment rollover and timeline
+        self.rolling_over = False
+        self.recording_wanted = False  # between start_recording and stop_recording
+        self.stopping = False  # stop_recording ran; the final chunk is spooled once StoppedState arrives
+        self.final_chunk_spooled = threading.Event()
+        self.final_chunk_spooled.set()
+        self.segment_times = {}  # chunk index -> {"start_ms", "duration_ms"} in epoch milliseconds
+        self.last_duration_ms = 0
+        self.last_stop_ms = None
+
+        # Adaptive recording profile, starting at (and never exceeding) the selected one
+        self.max_profile_index = recording_profile_index(profile or DEFAULT_RECORDING_PROFILE)
+        self.profile_index = self.max_profile_index
+        self.native_format = None  # camera format negotiated for the selected profile
+        self.profile_history = []  # (epoch ms, chunk index, profile name, reason)
+
+
+    
+    def ensure_recording_dir(self):
+        try:
+            if not os.path.exists(self.recording_dir):
                 os.makedirs(self.recording_dir)
 
             # Test writability
@@ -2101,7 +3979,14 @@ class BackgroundWebcamRecorder:
         
         # Connect error signal
         self.recorder.errorOccurred.connect(self.handle_error)
+
+        # Segment rollover is driven by the recorder state, not by a fixed delay
+        self.recorder.recorderStateChanged.connect(self.on_recorder_state_changed)
+        self.recorder.durationChanged.connect(self.on_duration_changed)
         
+        # Run the camera in the native format closest to the selected profile
+        self.negotiate_camera_format(capture_session.camera())
+
         # Set up the media format
         fmt = QMediaFormat()
         fmt.setFileFormat(QMediaFormat.FileFormat.MPEG4)
@@ -2109,12 +3994,10 @@ class BackgroundWebcamRecorder:
         
         # Add more specific settings
         self.recorder.setMediaFormat(fmt)
-        self.recorder.setQuality(QMediaRecorder.Quality.HighQuality)
-        self.recorder.setVideoResolution(QSize(640, 480))
-        self.recorder.setVideoFrameRate(30.0)
-        
+
         # Set up initial chunk file
         self.update_chunk_file()
+        self.apply_profile(self.profile_index, "initial")
         
         logging.info(f"Recorder configured with absolute path: {self.current_chunk_file}")
         return True
@@ -2126,6 +4009,8 @@ class BackgroundWebcamRecorder:
         
         # Create the simplified filename in the format "user_id-exam_id.mp4"
         # We'll append the chunk number internally to avoid overwriting files locally
+        self.chunk_counter = self.spool.allocate_seq()
+        self.current_chunk_spooled = False
         filename = f"{user_id}-{exam_id}_{self.chunk_counter}.mp4"
         
         # Create the full path
@@ -2141,15 +4026,109 @@ class BackgroundWebcamRecorder:
         # Increment chunk counter for next file
         self.chunk_counter += 1
     
+    def negotiate_camera_format(self, camera):
+        """Switch the camera to its native format closest to the selected profile"""
+        if camera is None:
+            return
+        profile = RECORDING_PROFILES[self.max_profile_index]
+        camera_format = select_camera_format(
+            camera.cameraDevice().videoFormats(), profile["resolution"], profile["fps"]
+        )
+        if camera_format is None:
+            logging.warning("Camera reports no video formats, recording with its default format")
+            return
+
+        if camera.cameraFormat() != camera_format:
+            camera.setCameraFormat(camera_format)
+        self.native_format = camera_format
+        size = camera_format.resolution()
+        logging.info(f"Camera format for profile '{profile['name']}': {size.width()}x{size.height()} "
+                     f"@ {camera_format.maxFrameRate():.0f} fps, {camera_format.pixelFormat()}")
+
+    def apply_profile(self, index, reason):
+        """Switch resolution, frame rate and quality; only call while the recorder is stopped"""
+        profile = RECORDING_PROFILES[index]
+        self.profile_index = index
+        resolution, fps = profile["resolution"], profile["fps"]
+
+        # At the selected profile, record exactly what the camera delivers - no scaling
+        if index == self.max_profile_index and self.native_format is not None:
+            size = self.native_format.resolution()
+            resolution = (size.width(), size.height())
+            fps = min(fps, self.native_format.maxFrameRate())
+
+        self.recorder.setQuality(profile["quality"])
+        self.recorder.setVideoResolution(QSize(*resolution))
+        self.recorder.setVideoFrameRate(fps)
+
+        self.profile_history.append((int(time.time() * 1000), self.chunk_counter - 1, profile["name"], reason))
+        logging.info(f"Recording profile '{profile['name']}' ({resolution[0]}x{resolution[1]} "
+                     f"@ {fps:.0f} fps) from chunk {self.chunk_counter - 1}: {reason}")
+
+    def adapt_profile(self):
+        """Step the profile for the segment about to start to what the uplink can carry"""
+        backlog = self.upload_worker.metrics()["queue_depth"]
+        index, reason = self.bandwidth.choose(
+            self.profile_index, self.chunk_interval / 1000, backlog, ceiling=self.max_profile_index
+        )
+        if index != self.profile_index:
+            self.apply_profile(index, reason)
+
     def handle_error(self, error, error_string):
+        # A rollover cut short by the error is picked up again by the next chunk timer tick
         logging.error(f"Recorder error ({error}): {error_string}")
+        self.rolling_over = False
+
+    def on_duration_changed(self, duration_ms):
+        self.last_duration_ms = duration_ms
+
+    def on_recorder_state_changed(self, state):
+        now_ms = int(time.time() * 1000)
+        chunk_index = self.chunk_counter - 1
+
+        if state == QMediaRecorder.RecorderState.RecordingState:
+            # Capture of this segment starts now - this is its position on the exam timeline
+            self.last_duration_ms = 0
+            self.segment_times[chunk_index] = {"start_ms": now_ms, "duration_ms": None}
+            if self.last_stop_ms is not None:
+                logging.info(f"Segment {chunk_index} started {now_ms - self.last_stop_ms} ms after the previous one stopped")
+
+        elif state == QMediaRecorder.RecorderState.StoppedState:
+            self.last_stop_ms = now_ms
+            segment = self.segment_times.get(chunk_index)
+            if segment is not None:
+                segment["duration_ms"] = self.last_duration_ms or (now_ms - segment["start_ms"])
+
+            # The file is finalized once the recorder reports it has stopped; roll over straight away
+            if self.stopping:
+                self.stopping = False
+                queued = self.upload_current_chunk()
+                logging.info(f"Final chunk {chunk_index} {'queued for upload' if queued else 'could not be queued'}")
+                self.final_chunk_spooled.set()
+            elif self.rolling_over:
+                self.rolling_over = False
+                self.process_and_start_new_chunk()
 
     def is_ready(self):
         return self.recorder is not None
 
+    def status(self):
+        recording = self.is_ready() and self.recorder.recorderState() == QMediaRecorder.RecorderState.RecordingState
+        return {
+            "state": "recording" if recording else "stopped",
+            "mode": "video",
+            "chunk": self.chunk_counter - 1,
+            "profile": RECORDING_PROFILES[self.profile_index]["name"],
+            "uploads": self.upload_worker.metrics(),
+        }
+
     def start_recording(self):
         if self.is_ready() and self.recorder.recorderState() != QMediaRecorder.RecorderState.RecordingState:
+            # Never record over a chunk that is already waiting for upload
+            if self.current_chunk_spooled:
+                self.update_chunk_file()
             logging.info(f"Starting recording to: {self.recorder.outputLocation().toLocalFile()}")
+            self.recording_wanted = True
             self.recorder.record()
             # Start the chunk timer
             self.chunk_timer.start(self.chunk_interval)
@@ -2161,84 +4140,172 @@ class BackgroundWebcamRecorder:
     def stop_recording(self):
         if self.is_ready() and self.recorder.recorderState() == QMediaRecorder.RecorderState.RecordingState:
             logging.info("Stopping recording...")
+            self.rolling_over = False
+            self.recording_wanted = False
+            # The final chunk goes to the upload worker from on_recorder_state_changed,
+            # once the recorder has finished writing it
+            self.stopping = True
+            self.final_chunk_spooled.clear()
             self.recorder.stop()
             # Stop the chunk timer
             self.chunk_timer.stop()
-            # Upload the final chunk
-            self.upload_current_chunk()
             logging.info(f"Recorder state after stopping: {self.recorder.recorderState()}")
             logging.info(f"Final recording duration: {self.recorder.duration()} ms")
             logging.info(f"Output file should be at: {self.recorder.outputLocation().toLocalFile()}")
+            logging.info(f"Recording profile history: {self.profile_history}")
+            return True
+        if self.is_ready() and self.recording_wanted:
+            # Already stopped by a recorder error - spool what was written
+            self.recording_wanted = False
+            self.chunk_timer.stop()
+            if not self.current_chunk_spooled:
+                self.upload_current_chunk()
             return True
         return False
     
     def handle_chunk_timer(self):
         # This function is called every 10 seconds
-        if self.recorder.recorderState() == QMediaRecorder.RecorderState.RecordingState:
-            # Stop current recording
+        state = self.recorder.recorderState()
+        if state == QMediaRecorder.RecorderState.RecordingState and not self.rolling_over:
+            # Stop current recording; on_recorder_state_changed starts the next
+            # segment as soon as this file is finalized
             logging.info("Stopping current chunk recording...")
+            self.rolling_over = True
             self.recorder.stop()
-            
-            # Add a small delay to ensure file is properly finalized
-            QTimer.singleShot(500, self.process_and_start_new_chunk)
+        elif state == QMediaRecorder.RecorderState.StoppedState and self.recording_wanted and not self.rolling_over:
+            # A recorder error stopped the segment (possibly mid-rollover) - spool what
+            # was written and carry on with a new one
+            logging.warning(f"Recorder stopped unexpectedly during chunk {self.chunk_counter - 1}, restarting")
+            self.process_and_start_new_chunk()
 
     def process_and_start_new_chunk(self):
-        # Upload the current chunk
-        success = self.upload_current_chunk()
-        logging.info(f"Upload of chunk {self.chunk_counter-1} {'succeeded' if success else 'failed'}")
-        
+        # Hand the finished chunk to the upload worker - recording does not wait for it
+        queued = self.upload_current_chunk()
+        logging.info(f"Chunk {self.chunk_counter-1} {'queued for upload' if queued else 'could not be queued'}")
+
         # Start a new chunk
         self.update_chunk_file()
+        self.adapt_profile()
         logging.info(f"Starting new chunk recording to: {self.current_chunk_file}")
         self.recorder.record()
     
     def upload_current_chunk(self):
-        if not self.current_chunk_file or not os.path.exists(self.current_chunk_file):
-            logging.error(f"Chunk file doesn't exist: {self.current_chunk_file}")
+        """Spool the chunk that was just finished for background upload"""
+        chunk_index = self.chunk_counter - 1
+        self.current_chunk_spooled = True
+        segment = self.segment_times.pop(chunk_index, None)
+
+        # Teach the estimator what the current profile actually produces
+        if segment and segment.get("duration_ms") and os.path.exists(self.current_chunk_file):
+            self.bandwidth.record_segment(
+                RECORDING_PROFILES[self.profile_index]["name"],
+                os.path.getsize(self.current_chunk_file),
+                segment["duration_ms"]
+            )
+
+        return self.upload_worker.submit(self.current_chunk_file, chunk_index, segment)
+
+    def flush_uploads(self, timeout=None):
+        """Wait for queued chunk uploads, e.g. before the final onstop notification"""
+        # Also wait for the final chunk, unless called on the recording thread
+        # itself - StoppedState could not be delivered there while we wait
+        if self.recorder is None or QThread.currentThread() != self.recorder.thread():
+            if not self.final_chunk_spooled.wait(timeout):
+                logging.warning("Final chunk not finalized by the recorder in time")
+        flushed = self.upload_worker.flush(timeout)
+        if not flushed:
+            logging.warning(f"Chunk uploads still pending: {self.upload_worker.metrics()}")
+        return flushed
+
+    def chunk_manifest(self):
+        return self.spool.manifest()
+
+    def reconcile_missing_chunks(self, missing):
+        """
+        Act on the chunks the server reported missing after the onstop manifest.
+
+        Returns:
+            list: Sequence numbers that can no longer be uploaded
+        """
+        lost = [seq for seq in missing if not self.spool.is_pending(seq)]
+        if len(lost) < len(missing):
+            logging.info(f"{len(missing) - len(lost)} missing chunk(s) still spooled, uploading them now")
+            self.flush_uploads(30)
+        if lost:
+            logging.error(f"Chunks missing on the server and no longer on disk: {lost}")
+        return lost
+
+    def upload_chunk(self, chunk_file, chunk_index):
+        if not chunk_file or not os.path.exists(chunk_file):
+            logging.error(f"Chunk file doesn't exist: {chunk_file}")
             return False
         
         try:
             # Log file info before upload attempt
-            file_size = os.path.getsize(self.current_chunk_file)
-            logging.info(f"Preparing to upload chunk: {self.current_chunk_file} (Size: {file_size} bytes)")
+            file_size = os.path.getsize(chunk_file)
+            logging.info(f"Preparing to upload chunk: {chunk_file} (Size: {file_size} bytes)")
             
             if file_size == 0:
                 logging.error("File size is 0 bytes, cannot upload empty file")
                 return False
                 
             # Format chunk counter with leading zeros
-            chunk_number = f"chunk{(self.chunk_counter - 1):04d}"
+            chunk_number = f"chunk{chunk_index:04d}"
             
             # Create file_name for the API request
             file_id = f"{self.user_id}-{self.exam_id}"
             
-            # Prepare multipart form data exactly matching Postman
-            with open(self.current_chunk_file, 'rb') as file_data:
-                files = {
-                    'exam_id': (None, str(self.exam_id)),
-                    'user_id': (None, str(self.user_id)),
-                    'chunk': (f"{file_id}.mp4", file_data, 'video/mp4'),  # Use proper MIME type
-                    'type': (None, 'ondataavailable'),
-                    'file_name': (None, file_id),
-                    'chunk_number': (None, chunk_number)
-                }
-                
-                # Set headers with token
-                headers = {
-                    'Authorization': f'Bearer {self.token}'
-                }
-                
-                # Log the request details
-                logging.info(f"Sending request to: {self.api_endpoint}")
-                logging.info(f"Headers: {headers}")
-                logging.info(f"Form data keys: {list(files.keys())}")
-                
-                # Send POST request
-                response = requests.post(
-                    self.api_endpoint,
-                    files=files,
-                    headers=headers
+            # Form fields exactly matching Postman
+            fields = {
+                'exam_id': str(self.exam_id),
+                'user_id': str(self.user_id),
+                'type': 'ondataavailable',
+                'file_name': file_id,
+                'chunk_number': chunk_number
+            }
+
+            # Exact segment timing so the server can stitch chunks into one timeline
+            segment = self.spool.entry(chunk_index) or {}
+            if segment.get("start_ms") is not None:
+                fields['segment_start_ms'] = str(segment["start_ms"])
+            if segment.get("duration_ms") is not None:
+                fields['segment_duration_ms'] = str(segment["duration_ms"])
+            if segment.get("sha256"):
+                fields['sha256'] = segment["sha256"]
+
+            # Block-wise upload that resumes from the server's offset after a dropped connection
+            if self.resumable_supported:
+                result = self.resumable_uploader.upload(
+                    chunk_file,
+                    fields,
+                    upload_id=segment.get("upload_id"),
+                    on_session=lambda upload_id: self.spool.set_upload_id(chunk_index, upload_id)
                 )
+                if result is not None:
+                    return result
+                logging.info("Server does not offer upload sessions, using single-request uploads")
+                self.resumable_supported = False
+
+            # Single multipart request, streamed from disk
+            body = MultipartFileStream(fields, 'chunk', f"{file_id}.mp4", chunk_file, 'video/mp4')
+
+            # Set headers with token
+            headers = {
+                'Authorization': f'Bearer {self.token}',
+                'Content-Type': body.content_type
+            }
+
+            # Log the request details
+            logging.info(f"Sending request to: {self.api_endpoint}")
+            logging.info(f"Headers: {headers}")
+            logging.info(f"Form data keys: {list(fields.keys()) + ['chunk']}")
+
+            # Send POST request
+            response = api_client.post(
+                self.api_endpoint,
+                data=body,
+                headers=headers
+            )
             
             # Check response
             logging.info(f"Response status code: {response.status_code}")
@@ -2249,8 +4316,7 @@ class BackgroundWebcamRecorder:
                     json_response = response.json()
                     if json_response.get('status') is True and "successful" in json_response.get('message', ''):
                         logging.info(f"Successfully uploaded chunk {chunk_number}")
-                        # Delete the file after successful upload
-                        os.remove(self.current_chunk_file)
+                        # The upload worker deletes the file once the spool records the ack
                         return True
                     else:
                         logging.warning(f"Upload response not as expected: {json_response}")
@@ -2274,6 +4340,354 @@ class BackgroundWebcamRecorder:
             logging.exception("Stack trace:")
             return False
         
+class RecordingWorker(QObject):
+    """
+    Lives on the camera broker's thread and owns the recorder.
+
+    Anything that touches it is handed over through call(), so the chunk
+    timer, recorder state changes and spool writes are all serviced by that
+    thread's own event loop, next to the capture session.
+    """
+    status_changed = pyqtSignal(object)
+
+    def __init__(self, recorder_factory, status_interval_ms=5000):
+        super().__init__()
+        self.recorder_factory = recorder_factory
+        self.status_interval_ms = status_interval_ms
+        self.recorder = None
+        self.camera_held = False
+        self.status_timer = None
+        self.status_lock = threading.Lock()
+        self.last_status = {"state": "idle"}
+
+    @pyqtSlot(object)
+    def call(self, fn):
+        fn()
+
+    def setup_camera(self):
+        # Hold the broker's camera open for as long as the recorder exists
+        if not self.camera_held:
+            if not shared_camera.acquire():
+                logging.error("Failed to open the shared camera")
+                return False
+            self.camera_held = True
+        if self.status_timer is None:
+            self.status_timer = QTimer()
+            self.status_timer.timeout.connect(self.publish_status)
+            self.status_timer.start(self.status_interval_ms)
+        return True
+
+    def create_recorder(self):
+        if self.recorder is None:
+            self.recorder = self.recorder_factory()
+        return self.recorder.is_ready()
+
+    def start(self):
+        started = self.recorder is not None and self.recorder.start_recording()
+        if not started:
+            logging.error("Failed to start exam recording")
+        self.publish_status()
+        return started
+
+    def stop(self):
+        stopped = self.recorder is not None and self.recorder.stop_recording()
+        self.publish_status()
+        return stopped
+
+    def shutdown(self):
+        if self.status_timer is not None:
+            self.status_timer.stop()
+        if self.recorder is not None:
+            self.recorder.stop_recording()
+        if self.camera_held:
+            self.camera_held = False
+            shared_camera.release()
+
+    @pyqtSlot()
+    def publish_status(self):
+        status = self.recorder.status() if self.recorder is not None else {"state": "idle"}
+        with self.status_lock:
+            self.last_status = status
+        self.status_changed.emit(status)
+
+
+class RecordingThread(QObject):
+    """
+    GUI-side handle for the recording pipeline on the camera broker's thread.
+
+    Control requests (setup, start, stop) aredelivered to the RecordingWorker
+    as queued signals, so chunk rotation keeps its cadence while the GUI thread
+    is busy with modal dialogs or long question loads. Offers the recorder's
+    interface to ExamPage; status is published with status_changed.
+    """
+    status_changed = pyqtSignal(object)
+    call_queued = pyqtSignal(object)
+    call_blocking = pyqtSignal(object)
+
+    def __init__(self, recorder_factory, parent=None):
+        super().__init__(parent)
+        # The recorder has to share a thread with the capture session it records from
+        self.worker_thread = shared_camera.ensure_thread()
+        self.worker = RecordingWorker(recorder_factory)
+        self.worker.moveToThread(self.worker_thread)
+
+        self.call_queued.connect(self.worker.call, Qt.ConnectionType.QueuedConnection)
+        self.call_blocking.connect(self.worker.call, Qt.ConnectionType.BlockingQueuedConnection)
+        self.worker.status_changed.connect(self.status_changed)
+
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.shutdown)
+
+    def run(self, fn, blocking=True):
+        """Run fn on the recording thread; blocking calls return its result or re-raise"""
+        if QThread.currentThread() == self.worker_thread:
+            return fn()
+        if not blocking:
+            self.call_queued.emit(fn)
+            return None
+
+        outcome = {}
+        def call():
+            try:
+                outcome["result"] = fn()
+            except Exception as e:
+                outcome["error"] = e
+        self.call_blocking.emit(call)
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome.get("result")
+
+    def setup_camera(self):
+        return self.run(self.worker.setup_camera)
+
+    def create_recorder(self):
+        return self.run(self.worker.create_recorder)
+
+    @property
+    def recorder(self):
+        return self.worker.recorder
+
+    def is_ready(self):
+        return self.recorder is not None and self.recorder.is_ready()
+
+    def start_recording(self):
+        if not self.is_ready():
+            return False
+        self.run(self.worker.start, blocking=False)
+        return True
+
+    def stop_recording(self):
+        # Blocking, so the final chunk is queued before anyone flushes uploads
+        return self.run(self.worker.stop)
+
+    def status(self):
+        with self.worker.status_lock:
+            return dict(self.worker.last_status)
+
+    # Upload-side calls are thread-safe and do not need the recording thread
+    def flush_uploads(self, timeout=None):
+        return self.recorder.flush_uploads(timeout)
+
+    def chunk_manifest(self):
+        return self.recorder.chunk_manifest()
+
+    def reconcile_missing_chunks(self, missing):
+        return self.recorder.reconcile_missing_chunks(missing)
+
+    @property
+    def api_endpoint(self):
+        return self.recorder.api_endpoint
+
+    @property
+    def token(self):
+        return self.recorder.token
+
+    def shutdown(self):
+        # The thread itself belongs to the camera broker, which stops it at exit
+        if not self.worker_thread.isRunning():
+            return
+        self.run(self.worker.shutdown)
+
+FACE_EVENTS_URL = "https://stageevaluate.sentientgeeks.us/wp-json/api/v1/save-proctoring-events"
+
+class FacePresenceMonitor(QObject):
+    """
+    Checks during the exam that exactly one face stays in frame.
+
+    Subscribed to the camera broker at max_fps: each frame is downscaled to a
+    small grayscale image and run through the face cascade on a worker
+    thread, paced so detection stays within cpu_budget of one core.
+    Conditions have to persist before an event fires (no face for no_face_s,
+    several faces for multi_face_s). Events are emitted as presence_event and
+    reported to the server in batches.
+    """
+    presence_event = pyqtSignal(str, object)
+
+    def __init__(self, token=None, user_id=None, exam_id=None, connectivity=None,
+                 max_fps=2, analysis_width=160, cpu_budget=0.05,
+                 no_face_s=10.0, multi_face_s=3.0, report_interval_s=30.0, parent=None):
+        super().__init__(parent)
+        self.token = token
+        self.user_id = user_id
+        self.exam_id = exam_id
+        self.connectivity = connectivity
+        self.max_fps = max_fps
+        self.analysis_width = analysis_width
+        self.cpu_budget = cpu_budget
+        self.no_face_s = no_face_s
+        self.multi_face_s = multi_face_s
+        self.report_interval_s = report_interval_s
+
+        self.running = True
+        self.stopped = False
+        self.subscription = None
+        self.lock = threading.Lock()
+        self.busy = False
+        self.next_analysis_at = 0.0
+        self.worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="face-presence")
+        self.track = FaceTrack()
+
+        # Worker thread state
+        self.started_at = time.monotonic()
+        self.last_face_at = self.started_at
+        self.absent_reported = False
+        self.multi_since = None
+        self.multi_reported = False
+        self.events = deque(maxlen=200)
+        self.last_report_at = self.started_at
+        self.analyses = 0
+        self.cpu_seconds = 0.0
+
+    def attach(self, camera):
+        self.subscription = camera.subscribe(self.on_frame, max_fps=self.max_fps, direct=True, name="face-presence")
+        return self.subscription is not None
+
+    def on_frame(self, frame):
+        """Direct subscriber, called on the camera thread"""
+        if not self.running:
+            return
+        with self.lock:
+            if self.busy or time.monotonic() < self.next_analysis_at:
+                return
+            self.busy = True
+
+        started = time.perf_counter()
+        # YUV frames: subsample the mapped luma plane, copying only the thumbnail
+        source = luma_thumbnail(frame, self.analysis_width)
+        if source is None:
+            source = frame.toImage()
+            if source.isNull():
+                with self.lock:
+                    self.busy = False
+                return
+        convert_seconds = time.perf_counter() - started
+        self.worker.submit(self.analyse, source, convert_seconds)
+
+    def analyse(self, source, convert_seconds):
+        started = time.perf_counter()
+        try:
+            if not face_detector.available():
+                logging.error("Face presence monitoring disabled - no face detector available")
+                self.running = False
+                return
+
+            if isinstance(source, np.ndarray):
+                gray = source
+            else:
+                height = max(1, round(source.height() * self.analysis_width / max(1, source.width())))
+                gray = qimage_gray_array(source, self.analysis_width, height)
+            faces = face_detector.detect(gray, self.track)
+            self.update_state(len(faces), self.track.last_scan_full)
+        except Exception as e:
+            logging.error(f"Face presence analysis failed: {e}")
+        finally:
+            cost = time.perf_counter() - started + convert_seconds
+            with self.lock:
+                self.analyses += 1
+                self.cpu_seconds += cost
+                # Pace the next analysis so detection stays within the CPU budget
+                self.next_analysis_at = time.monotonic() + cost / self.cpu_budget
+                self.busy = False
+
+        if time.monotonic() - self.last_report_at >= self.report_interval_s:
+            self.report_events()
+
+    def update_state(self, face_count, full_scan=True):
+        now = time.monotonic()
+        if face_count > 0:
+            if self.absent_reported:
+                self.emit_event("face_returned", {"absent_s": round(now - self.last_face_at, 1)})
+                self.absent_reported = False
+            self.last_face_at = now
+        elif not self.absent_reported and now - self.last_face_at >= self.no_face_s:
+            self.absent_reported = True
+            self.emit_event("no_face", {"absent_s": round(now - self.last_face_at, 1)})
+
+        if face_count > 1:
+            if self.multi_since is None:
+                self.multi_since = now
+            if not self.multi_reported and now - self.multi_since >= self.multi_face_s:
+                self.multi_reported = True
+                self.emit_event("multiple_faces", {"faces": face_count})
+        elif full_scan:
+            # A region scan only looks near the tracked face, so only a full scan can clear this
+            if self.multi_reported:
+                self.emit_event("multiple_faces_cleared", {"duration_s": round(now - self.multi_since, 1)})
+            self.multi_since = None
+            self.multi_reported = False
+
+    def emit_event(self, kind, details):
+        event = {"event": kind, "at_ms": int(time.time() * 1000), **details}
+        self.events.append(event)
+        logging.warning(f"[FacePresence] {event}")
+        self.presence_event.emit(kind, event)
+
+    def report_events(self):
+        """Send the queued events in one request; they stay queued if that fails. Runs on the worker."""
+        self.last_report_at = time.monotonic()
+        if not self.events:
+            return True
+        if self.connectivity is not None and not self.connectivity.is_online():
+            return False
+
+        batch = list(self.events)
+        payload = {"exam_id": self.exam_id, "user_id": self.user_id, "events": batch}
+        try:
+            response = api_client.post(
+                FACE_EVENTS_URL,
+                json=payload,
+                headers={'Authorization': f'Bearer {self.token}'}
+            )
+        except requests.RequestException as e:
+            logging.error(f"Request error reporting face presence events: {e}")
+            return False
+
+        if response.status_code != 200:
+            logging.error(f"Failed to report face presence events: {response.status_code} {response.text}")
+            return False
+        for _ in batch:
+            self.events.popleft()
+        logging.info(f"Reported {len(batch)} face presence event(s)")
+        return True
+
+    def cpu_usage(self):
+        """Share of one core spent on face presence analysis so far"""
+        with self.lock:
+            return self.cpu_seconds / max(1e-6, time.monotonic() - self.started_at)
+
+    def stop(self):
+        if self.stopped:
+            return
+        self.stopped = True
+        self.running = False
+        if self.subscription is not None:
+            self.subscription.cancel()
+        logging.info(f"Face presence monitor stopped after {self.analyses} analyses, "
+                     f"{self.cpu_usage() * 100:.1f}% of one core, latency {face_detector.stats()}")
+        self.worker.submit(self.report_events)
+        self.worker.shutdown(wait=False)
+
 # 3. Device Selection Dialog
 class DeviceSelectionDialog(QDialog):
     def __init__(self, parent=None):
@@ -2511,6 +4925,14 @@ class DeviceSelectionDialog(QDialog):
         else:
             QMessageBox.warning(self, "Device Refresh", "Some devices could not be detected. Check your hardware connections.")
 
+    def selected_video_device(self):
+        """QCameraDevice for the chosen camera, or None if it is no longer connected"""
+        index = self.video_combo.currentData()
+        available_cameras = QMediaDevices.videoInputs()
+        if isinstance(index, int) and 0 <= index < len(available_cameras):
+            return available_cameras[index]
+        return None
+
     def get_selected_devices(self):
         """Return the selected audio and video devices"""
         audio_device = self.audio_combo.currentText()
@@ -2582,10 +5004,160 @@ class DeviceSelectionDialog(QDialog):
         if not audio_device or not video_device:
             QMessageBox.warning(self, "Device Selection", "Please select both audio and video devices.")
             return
-            
+
+        # The check, the preview and the exam all use this camera from now on
+        shared_camera.select_device(self.selected_video_device())
+
         # All good, accept the dialog
         super().accept()
 
+# Draw frame timings over the device preview; enable with EVALUATE_PREVIEW_OVERLAY=1
+PREVIEW_TIMING_OVERLAY = os.environ.get("EVALUATE_PREVIEW_OVERLAY") == "1"
+
+class PreviewRenderer(QObject):
+    """
+    Renders camera preview frames off the GUI thread.
+
+    Subscribes to the camera broker at max_fps. Each accepted frame is
+    converted and smooth-scaled on a worker thread into a buffer image that
+    is reused while the target size stays the same; the GUI thread only turns
+    it into a pixmap. A frame counts as in flight until it has been shown,
+    and frames arriving in the meantime are dropped. With overlay set, the
+    shown fps, render time, camera-to-screen latency and drop counts are
+    drawn over the image.
+    """
+    frame_ready = pyqtSignal(QPixmap)
+    render_failed = pyqtSignal(str)
+    rendered = pyqtSignal(object, float, float)
+
+    def __init__(self, max_fps=15, overlay=PREVIEW_TIMING_OVERLAY, parent=None):
+        super().__init__(parent)
+        self.max_fps = max_fps
+        self.overlay = overlay
+        self.background = QColor("#e0e0e0")
+        self.subscription = None
+        self.running = False
+        self.lock = threading.Lock()
+        self.in_flight = False
+        self.target_width = 400
+        self.target_height = 300
+        self.worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="preview-render")
+        self.buffer = None  # worker thread only
+
+        # Metrics
+        self.frames_shown = 0
+        self.dropped_in_flight = 0
+        self.render_ms = 0.0
+        self.latency_ms = 0.0
+        self.shown_times = deque(maxlen=30)
+
+        self.rendered.connect(self.present, Qt.ConnectionType.QueuedConnection)
+        self.render_failed.connect(self.release_frame)
+
+    def start(self, camera):
+        self.running = True
+        self.subscription = camera.subscribe(self.on_frame, max_fps=self.max_fps, direct=True, name="preview-render")
+        return self.subscription is not None
+
+    def set_target_size(self, width, height):
+        with self.lock:
+            self.target_width = max(1, width)
+            self.target_height = max(1, height)
+
+    def on_frame(self, frame):
+        """Direct subscriber, called on the camera thread"""
+        if not self.running:
+            return
+        with self.lock:
+            if self.in_flight:
+                self.dropped_in_flight += 1
+                return
+            self.in_flight = True
+        try:
+            self.worker.submit(self.render, frame, time.monotonic())
+        except RuntimeError:
+            # Worker already shut down
+            pass
+
+    def render(self, frame, received_at):
+        try:
+            self.render_frame(frame, received_at)
+        except Exception as e:
+            # Always hand the frame back, or the preview would stall
+            self.render_failed.emit(f"Preview render error: {e}")
+
+    def render_frame(self, frame, received_at):
+        started = time.perf_counter()
+        if not frame.isValid():
+            self.render_failed.emit("Invalid frame from camera")
+            return
+        image = frame.toImage()
+        if image.isNull():
+            self.render_failed.emit("Invalid image from camera")
+            return
+
+        with self.lock:
+            width, height = self.target_width, self.target_height
+        if self.buffer is None or self.buffer.width() != width or self.buffer.height() != height:
+            self.buffer = QImage(width, height, QImage.Format.Format_RGB32)
+        self.buffer.fill(self.background)
+
+        # Scale into the middle of the buffer, keeping the aspect ratio
+        size = image.size().scaled(width, height, Qt.AspectRatioMode.KeepAspectRatio)
+        target = QRect((width - size.width()) // 2, (height - size.height()) // 2, size.width(), size.height())
+        painter = QPainter(self.buffer)
+        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+        painter.drawImage(target, image)
+        if self.overlay:
+            self.draw_overlay(painter, width)
+        painter.end()
+
+        self.rendered.emit(self.buffer, received_at, time.perf_counter() - started)
+
+    def draw_overlay(self, painter, width):
+        rate_drops = self.subscription.dropped_rate if self.subscription else 0
+        text = (f"{self.shown_fps():.1f} fps | render {self.render_ms:.1f} ms | "
+                f"latency {self.latency_ms:.0f} ms | dropped {self.dropped_in_flight} busy, {rate_drops} rate")
+        painter.fillRect(QRect(0, 0, width, 22), QColor(0, 0, 0, 160))
+        painter.setPen(QColor("white"))
+        painter.setFont(QFont("Consolas", 9))
+        painter.drawText(QRect(6, 0, width - 12, 22), Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft, text)
+
+    def shown_fps(self):
+        times = list(self.shown_times)
+        if len(times) < 2 or times[-1] <= times[0]:
+            return 0.0
+        return (len(times) - 1) / (times[-1] - times[0])
+
+    @pyqtSlot(object, float, float)
+    def present(self, image, received_at, render_seconds):
+        # fromImage copies, so the worker may draw into the buffer again right after
+        pixmap = QPixmap.fromImage(image)
+        now = time.monotonic()
+        self.frames_shown += 1
+        self.shown_times.append(now)
+        self.render_ms = 0.8 * self.render_ms + 0.2 * render_seconds * 1000
+        self.latency_ms = 0.8 * self.latency_ms + 0.2 * (now - received_at) * 1000
+        self.release_frame()
+        if self.running:
+            self.frame_ready.emit(pixmap)
+
+    def release_frame(self):
+        with self.lock:
+            self.in_flight = False
+
+    def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        if self.subscription is not None:
+            self.subscription.cancel()
+            self.subscription = None
+        self.worker.shutdown(wait=False)
+        logging.info(f"[PreviewRenderer] {self.frames_shown} frames shown, {self.dropped_in_flight} dropped "
+                     f"in flight, render {self.render_ms:.1f} ms, latency {self.latency_ms:.0f} ms")
+
+
 class DemoPreviewDialog(QDialog):
     def __init__(self, audio_device, video_device, parent=None):
         super().__init__(parent)
@@ -2809,48 +5381,31 @@ class DemoPreviewDialog(QDialog):
             # Use the selected camera or fall back to default
             camera_info = available_cameras[self.video_device_id] if self.video_device_id < len(available_cameras) else available_cameras[0]
             
-            # Set up the camera
-            self.camera = QCamera(camera_info)
-            self.camera_captureSession = QMediaCaptureSession()
-            self.camera_captureSession.setCamera(self.camera)
-            
-            # Create a video sink to receive frames
-            self.videoSink = QVideoSink()
-            self.camera_captureSession.setVideoSink(self.videoSink)
-            
-            # Connect the video frame signal to update the preview
-            self.videoSink.videoFrameChanged.connect(self.update_video_frame)
-            
-            # Start the camera
-            self.camera.start()
+            # Only shown here - DeviceSelectionDialog.accept makes it the selection.
+            # Frames are scaled on a worker thread; the GUI thread only shows the result
+            shared_camera.preview_device(camera_info)
+            self.preview_renderer = PreviewRenderer(parent=self)
+            self.preview_renderer.set_target_size(self.video_preview.width(), self.video_preview.height())
+            self.preview_renderer.frame_ready.connect(self.update_video_frame)
+            self.preview_renderer.render_failed.connect(self.handle_camera_error)
+            if not self.preview_renderer.start(shared_camera):
+                self.handle_camera_error("Could not open the camera")
+                return
             self.camera_status.setText("Camera started successfully")
             self.camera_status.setStyleSheet("color: green;")
             
         except Exception as e:
             self.handle_camera_error(f"Camera error: {str(e)}")
     
-    def update_video_frame(self, frame):
-        """Update the video preview with the latest frame"""
-        # Check if dialog is still active before processing the frame
+    def update_video_frame(self, pixmap):
+        """Show a preview frame, already scaled by the preview renderer"""
+        # Check if dialog is still active before showing the frame
         if not self.is_active:
             return
-            
-        if frame.isValid():
-            # Convert QVideoFrame to QImage
-            image = frame.toImage()
-            if not image.isNull():
-                # Scale image to fit the label while maintaining aspect ratio
-                pixmap = QPixmap.fromImage(image)
-                scaled_pixmap = pixmap.scaled(
-                    self.video_preview.width(), 
-                    self.video_preview.height(),
-                    Qt.AspectRatioMode.KeepAspectRatio
-                )
-                self.video_preview.setPixmap(scaled_pixmap)
-            else:
-                self.handle_camera_error("Invalid image from camera")
-        else:
-            self.handle_camera_error("Invalid frame from camera")
+
+        self.video_preview.setPixmap(pixmap)
+        # Render the following frames at the label's current size
+        self.preview_renderer.set_target_size(self.video_preview.width(), self.video_preview.height())
     
     def handle_camera_error(self, message):
         """Handle camera errors by showing an error message"""
@@ -3023,9 +5578,11 @@ class DemoPreviewDialog(QDialog):
         # Set the active flag to False first
         self.is_active = False
         
-        # Stop the camera
-        if hasattr(self, 'camera') and self.camera:
-            self.camera.stop()
+        # Stop the preview and go back to the selected camera; the broker closes
+        # the camera once nobody else needs it
+        if getattr(self, 'preview_renderer', None):
+            self.preview_renderer.stop()
+        shared_camera.preview_device(None)
         
         # Stop the audio stream
         if hasattr(self, 'audio_stream') and self.audio_stream:
@@ -3043,9 +5600,11 @@ class DemoPreviewDialog(QDialog):
         # Set the active flag to False first
         self.is_active = False
         
-        # Stop the camera
-        if hasattr(self, 'camera') and self.camera:
-            self.camera.stop()
+        # Stop the preview and go back to the selected camera; the broker closes
+        # the camera once nobody else needs it
+        if getattr(self, 'preview_renderer', None):
+            self.preview_renderer.stop()
+        shared_camera.preview_device(None)
         
         # Stop the audio stream
         if hasattr(self, 'audio_stream') and self.audio_stream:
@@ -3163,42 +5722,580 @@ class ExamInstructionsPage(QWidget):
             # Refresh exam details using a valid exam identifier (e.g., exam code)
             exam_link = self.exam_details.get("exam_link") or ""  # Adjust as needed
             print("🔹 Calling get_exam_details after countdown ends with exam_link:", exam_link)
-            updated_details = get_exam_details(SESSION_TOKEN, exam_link)
-            print("🔹 Updated Exam Details received:", updated_details)
-            logging.info("Updated Exam Details received after countdown: " + str(updated_details))
-            
-            if updated_details and updated_details.get("status"):
-                self.exam_details = updated_details
-                question_ids = updated_details.get("questionsIds", [])
-                print("🔹 Question IDs after update:", question_ids)
-                logging.info("Question IDs after update: " + str(question_ids))
-                
-                if question_ids:
-                    question_data = fetch_question(
-                        question_ids[0],
-                        updated_details.get("examId") or updated_details.get("exam_id"),
-                        updated_details.get("userId") or updated_details.get("user_id") or "default_user",
-                        idx=0,
-                        first_request=True
-                    )
-                    print("🔹 Fetched first question:", question_data)
-                    logging.info("Fetched first question: " + str(question_data))
-                else:
-                    print("⚠️ No question IDs returned in exam details.")
-                    logging.warning("No question IDs returned in exam details.")
+            gui_tasks.run(get_exam_details, SESSION_TOKEN, exam_link,
+                          on_done=self.on_exam_details_refreshed,
+                          on_error=lambda e: self.on_exam_details_refreshed(None))
+
+    def on_exam_details_refreshed(self, updated_details):
+        print("🔹 Updated Exam Details received:", updated_details)
+        logging.info("Updated Exam Details received after countdown: " + str(updated_details))
+        
+        if updated_details and updated_details.get("status"):
+            self.exam_details = updated_details
+            question_ids = updated_details.get("questionsIds", [])
+            print("🔹 Question IDs after update:", question_ids)
+            logging.info("Question IDs after update: " + str(question_ids))
+            
+            if question_ids:
+                gui_tasks.run(
+                    fetch_question,
+                    question_ids[0],
+                    updated_details.get("examId") or updated_details.get("exam_id"),
+                    updated_details.get("userId") or updated_details.get("user_id") or "default_user",
+                    idx=0,
+                    first_request=True,
+                    on_done=self.on_first_question_fetched,
+                    on_error=lambda e: self.on_first_question_fetched(None)
+                )
+                return
             else:
-                print("❌ Failed to refresh exam details.")
-                logging.error("Failed to refresh exam details after countdown.")
+                print("⚠️ No question IDs returned in exam details.")
+                logging.warning("No question IDs returned in exam details.")
+        else:
+            print("❌ Failed to refresh exam details.")
+            logging.error("Failed to refresh exam details after countdown.")
 
-            # Call the callback to switch to the exam page with updated details
-            self.switch_to_exam_callback(self.exam_details)
-    
+        # Call the callback to switch to the exam page with updated details
+        self.switch_to_exam_callback(self.exam_details)
+
+    def on_first_question_fetched(self, question_data):
+        print("🔹 Fetched first question:", question_data)
+        logging.info("Fetched first question: " + str(question_data))
+        self.switch_to_exam_callback(self.exam_details)
+
+
+
+class QuestionPrefetcher(QObject):
+    """
+    Fetches exam questions on a bounded worker pool.
+
+    Each result is delivered back on the GUI thread through question_fetched as soon
+    as it arrives, so the caller can fill in the question panel out of order.
+    Failed fetches are rescheduled with a capped backoff until they succeed or
+    the prefetcher is stopped.
+    """
+    question_fetched = pyqtSignal(int, object)  # idx, question data
+    question_failed = pyqtSignal(int, int)      # idx, attempt number
+
+    def __init__(self, exam_id, user_id, max_workers=6, parent=None):
+        super().__init__(parent)
+        self.exam_id = exam_id
+        self.user_id = user_id
+        self.max_retry_delay = 30  # seconds
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="question-fetch")
+        self.stopped = False
+
+    def submit(self, idx, question_id, attempt=0, cancel_event=None):
+        if self.stopped or (cancel_event is not None and cancel_event.is_set()):
+            return
+        try:
+            self.executor.submit(self._fetch, idx, question_id, attempt, cancel_event)
+        except RuntimeError:
+            # Executor already shut down
+            pass
+
+    def _fetch(self, idx, question_id, attempt, cancel_event):
+        if self.stopped or (cancel_event is not None and cancel_event.is_set()):
+            return
+
+        question_data = fetch_question(question_id, self.exam_id, self.user_id, idx,
+                                       first_request=False, cancel_event=cancel_event)
+        if self.stopped:
+            return
+
+        if question_data:
+            self.question_fetched.emit(idx, question_data)
+            return
+
+        # Cancelled fetches are not retried
+        if cancel_event is not None and cancel_event.is_set():
+            return
+
+        attempt += 1
+        self.question_failed.emit(idx, attempt)
+
+        # Retry in the background with jittered exponential backoff
+        delay = min(self.max_retry_delay, 2 ** attempt) + random.uniform(0, 0.5)
+        logging.warning(f"[QuestionPrefetcher] Question {question_id} (idx {idx}) failed, retry {attempt} in {delay:.1f}s")
+        retry_timer = threading.Timer(delay, self.submit, args=(idx, question_id, attempt, cancel_event))
+        retry_timer.daemon = True
+        retry_timer.start()
+
+    def stop(self):
+        self.stopped = True
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class QuestionStore(QObject):
+    """
+    Lazy, index-addressable store of exam questions.
+
+    Only the current question and a window of neighbours are fetched, and at most
+    max_cached payloads are held in memory (least recently used are evicted first).
+    Indexing returns None for a question that is not in memory yet; the fetch is
+    then issued and question_ready is emitted when it lands.
+    """
+    question_ready = pyqtSignal(int, object)  # idx, question data
+    question_failed = pyqtSignal(int, int)    # idx, attempt number
+
+    def __init__(self, window=3, max_cached=12, parent=None):
+        super().__init__(parent)
+        self.window = window
+        # Never evict inside the active window
+        self.max_cached = max(max_cached, 2 * window + 1)
+        self.question_ids = []
+        self.cache = OrderedDict()
+        self.pending = set()
+        self.cancel_events = {}
+        self.fetched_once = set()
+        self.center = 0
+        self.prefetcher = None
+
+    def reset(self, question_ids, exam_id, user_id):
+        self.stop()
+        self.question_ids = list(question_ids)
+        self.cache.clear()
+        self.pending.clear()
+        self.cancel_events.clear()
+        self.fetched_once.clear()
+        self.center = 0
+        self.prefetcher = QuestionPrefetcher(exam_id, user_id, parent=self)
+        self.prefetcher.question_fetched.connect(self.on_fetched)
+        self.prefetcher.question_failed.connect(self.question_failed)
+
+    def __len__(self):
+        return len(self.question_ids)
+
+    def __getitem__(self, idx):
+        data = self.cache.get(idx)
+        if data is not None:
+            self.cache.move_to_end(idx)
+        return data
+
+    def has_been_fetched(self, idx):
+        return idx in self.fetched_once
+
+    def ensure_window(self, center):
+        """Fetch the question at center first, then its neighbours nearest-first"""
+        # Stopped - a late call after stop() does nothing
+        if self.prefetcher is None:
+            return
+        self.center = center
+
+        # Cancel fetches (and their retries) the candidate has navigated away from
+        for idx in list(self.pending):
+            if abs(idx - center) > self.window:
+                self.pending.discard(idx)
+                self.cancel_events.pop(idx).set()
+
+        order = [center]
+        for offset in range(1, self.window + 1):
+            order.extend([center + offset, center - offset])
+
+        for idx in order:
+            if 0 <= idx < len(self.question_ids) and idx not in self.cache and idx not in self.pending:
+                self.pending.add(idx)
+                self.cancel_events[idx] = threading.Event()
+                self.prefetcher.submit(idx, self.question_ids[idx], cancel_event=self.cancel_events[idx])
+
+    def on_fetched(self, idx, question_data):
+        self.pending.discard(idx)
+        self.cancel_events.pop(idx, None)
+        if idx >= len(self.question_ids):
+            return
+
+        self.cache[idx] = question_data
+        self.cache.move_to_end(idx)
+        self.fetched_once.add(idx)
+        self.evict()
+        self.question_ready.emit(idx, question_data)
+
+    def evict(self):
+        if len(self.cache) <= self.max_cached:
+            return
+        for idx in list(self.cache):
+            if len(self.cache) <= self.max_cached:
+                break
+            if abs(idx - self.center) > self.window:
+                del self.cache[idx]
+                logging.debug(f"[QuestionStore] Evicted question idx {idx}")
+
+    def stop(self):
+        for cancel_event in self.cancel_events.values():
+            cancel_event.set()
+        self.cancel_events.clear()
+        self.pending.clear()
+        if self.prefetcher:
+            self.prefetcher.stop()
+            self.prefetcher = None
+
+
+class AnswerJournal:
+    """
+    Append-only on-disk journal of answer changes for one exam.
+
+    Every answer change is written as a JSON line with a sequence number, and a
+    separate ack line is written once the server accepts it. Lines are flushed
+    to the OS immediately (so a killed process loses nothing). Batched fsyncs
+    and compaction to the latest entry per question, once the file grows past
+    compact_threshold lines, happen in maintain(), which the save worker calls
+    so the GUI thread never waits on the disk.
+    """
+    def __init__(self, exam_code, journal_dir="exam_journal", fsync_batch=20, fsync_interval=2.0,
+                 compact_threshold=500):
+        safe_code = re.sub(r"[^A-Za-z0-9_-]", "_", str(exam_code)) or "unknown"
+        os.makedirs(journal_dir, exist_ok=True)
+        self.path = os.path.abspath(os.path.join(journal_dir, f"{safe_code}.jsonl"))
+        self.submission_path = os.path.abspath(os.path.join(journal_dir, f"{safe_code}.onstop.json"))
+        self.fsync_batch = fsync_batch
+        self.fsync_interval = fsync_interval
+        self.compact_threshold = compact_threshold
+        self.lock = threading.Lock()
+        self.entries = {}  # question_id -> latest answer entry
+        self.seq = 0
+        self.line_count = 0
+        self.appended = 0  # lines written since opening, to detect appends during compaction
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+        self.load()
+        self.file = open(self.path, "a", encoding="utf-8")
+
+    def load(self):
+        """Rebuild the latest entry per question from an existing journal file"""
+        if not os.path.exists(self.path):
+            return self.entries
+
+        acked = set()
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Torn final write from a crash
+                    logging.warning(f"[AnswerJournal] Skipping unreadable line in {self.path}")
+                    continue
+                self.line_count += 1
+                self.seq = max(self.seq, record.get("seq", 0))
+                if record.get("op") == "answer":
+                    record["acked"] = record.get("acked", False)
+                    self.entries[record["question_id"]] = record
+                elif record.get("op") == "ack":
+                    acked.add(record["seq"])
+
+        for entry in self.entries.values():
+            if entry["seq"] in acked:
+                entry["acked"] = True
+
+        logging.info(f"[AnswerJournal] Loaded {len(self.entries)} answer(s) from {self.path}")
+        return self.entries
+
+    def record_answer(self, question_id, question_type, answer):
+        """Journal an answer change and return its sequence number"""
+        raw = list(answer) if isinstance(answer, tuple) else answer
+        with self.lock:
+            self.seq += 1
+            entry = {
+                "op": "answer",
+                "seq": self.seq,
+                "question_id": str(question_id),
+                "question_type": question_type,
+                "answer": format_answer_for_api(question_type, answer),
+                "raw": raw,
+                "acked": False,
+            }
+            self.entries[entry["question_id"]] = entry
+            self._append(entry)
+            return self.seq
+
+    def record_ack(self, question_id, seq):
+        with self.lock:
+            entry = self.entries.get(str(question_id))
+            if entry and entry["seq"] == seq:
+                entry["acked"] = True
+            self._append({"op": "ack", "seq": seq, "question_id": str(question_id)})
+
+    def unacknowledged(self):
+        with self.lock:
+            return sorted((e for e in self.entries.values() if not e["acked"]), key=lambda e: e["seq"])
+
+    def _append(self, record):
+        """Callers hold the lock. Only writes and flushes; fsync is left to maintain()."""
+        if self.file.closed:
+            logging.warning(f"[AnswerJournal] Journal closed, {record['op']} {record['seq']} kept in memory only")
+            return
+        self.file.write(json.dumps(record) + "\n")
+        self.file.flush()
+        self.line_count += 1
+        self.appended += 1
+        self.unsynced += 1
+
+    def _sync(self):
+        os.fsync(self.file.fileno())
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+
+    def maintain(self):
+        """Run a due fsync or compaction. Called from the save worker, never the GUI thread."""
+        with self.lock:
+            if self.file.closed:
+                return
+            compact = self.line_count >= self.compact_threshold
+            sync = self.unsynced and (self.unsynced >= self.fsync_batch
+                                      or time.monotonic() - self.last_sync >= self.fsync_interval)
+        if compact:
+            self._compact()
+        elif sync:
+            self.sync()
+
+    def _compact(self):
+        """Rewrite the journal keeping only the latest entry per question"""
+        with self.lock:
+            snapshot = [dict(entry) for entry in sorted(self.entries.values(), key=lambda e: e["seq"])]
+            generation = self.appended
+
+        # The rewrite and its fsync run without the lock, so record_answer is not held up
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as tmp:
+            for entry in snapshot:
+                tmp.write(json.dumps(entry) + "\n")
+            tmp.flush()
+            os.fsync(tmp.fileno())
+
+        with self.lock:
+            if self.appended != generation or self.file.closed:
+                # Something was journaled meanwhile - the next maintain() tries again
+                os.remove(tmp_path)
+                return False
+            self.file.close()
+            os.replace(tmp_path, self.path)
+            self.file = open(self.path, "a", encoding="utf-8")
+            self.line_count = len(snapshot)
+            self.unsynced = 0
+            self.last_sync = time.monotonic()
+        logging.info(f"[AnswerJournal] Compacted journal to {len(snapshot)} entries")
+        return True
+
+    def sync(self):
+        with self.lock:
+            if self.file.closed or not self.unsynced:
+                return
+            fileno = self.file.fileno()
+            self.unsynced = 0
+            self.last_sync = time.monotonic()
+        # Outside the lock, so record_answer keeps appending while the disk catches up
+        try:
+            os.fsync(fileno)
+        except OSError as e:
+            # The file was swapped by a compaction or closed meanwhile; both fsync themselves
+            logging.debug(f"[AnswerJournal] fsync skipped: {e}")
+
+    def close(self):
+        with self.lock:
+            if not self.file.closed:
+                self._sync()
+                self.file.close()
+
+    def queue_submission(self, record):
+        """Durably record an onstop notification that could not be sent yet"""
+        tmp_path = self.submission_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(record, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.submission_path)
+
+    def queued_submission(self):
+        """The onstop notification left over from an earlier run, or None"""
+        try:
+            with open(self.submission_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            logging.error(f"[AnswerJournal] Unreadable queued submission in {self.submission_path}")
+            return None
+
+    def clear_submission(self):
+        try:
+            os.remove(self.submission_path)
+        except FileNotFoundError:
+            pass
+
+
+# Border ring drawn on a question-panel button to show its answer save state
+SAVE_STATE_BORDERS = {
+    "pending": "border: 2px solid #F5A623;",
+    "failed": "border: 2px solid #E53935;",
+}
+
+
+class AnswerSaveQueue(QObject):
+    """
+    Ordered, per-question queue of answer saves served by a background worker.
+
+    Navigation only enqueues; the worker thread performs the blocking API call.
+    If a question is changed again before its save goes out, only the latest
+    answer is sent. Progress is reported through save_state_changed as
+    "pending", "saved" or "failed". The worker also runs the journal's fsyncs
+    and compaction, and closes it once the queue is stopped and drained.
+    """
+    save_state_changed = pyqtSignal(str, str)  # question_id, state
+
+    def __init__(self, exam_id, user_id, session_token, journal=None, connectivity=None, parent=None):
+        super().__init__(parent)
+        self.exam_id = exam_id
+        self.user_id = user_id
+        self.session_token = session_token
+        self.journal = journal
+        self.connectivity = connectivity
+        self.pending = OrderedDict()
+        self.acknowledged = {}  # question_id -> last formatted answer the server accepted
+        self.in_flight = None
+        self.running = True
+        self.condition = threading.Condition()
+        self.worker = threading.Thread(target=self._run, name="answer-save", daemon=True)
+        self.worker.start()
+
+    def enqueue(self, question_id, question_type, answer):
+        """Queue an answer. Returns False if it matches what the server already holds."""
+        question_id = str(question_id)
+        formatted = format_answer_for_api(question_type, answer)
+        with self.condition:
+            idle = question_id not in self.pending and self.in_flight != question_id
+            if idle and self.acknowledged.get(question_id) == formatted:
+                return False
+
+        # Journaled outside the queue lock; record_answer only appends, it never fsyncs
+        seq = self.journal.record_answer(question_id, question_type, answer) if self.journal else None
+        with self.condition:
+            # Replaces any older answer still waiting for this question
+            self.pending[question_id] = (question_type, answer, seq)
+            self.condition.notify_all()
+        self.save_state_changed.emit(question_id, "pending")
+        return True
+
+    def _run(self):
+        while True:
+            # Batched fsyncs and compaction of the journal happen here, off the GUI thread
+            if self.journal:
+                self.journal.maintain()
+
+            with self.condition:
+                if self.running and not self.pending:
+                    self.condition.wait(self.journal.fsync_interval if self.journal else None)
+                    continue
+                if not self.pending:
+                    break
+
+            # Hold queued saves while the server is unreachable
+            if self.connectivity and not self.connectivity.wait_online(timeout=1.0):
+                continue
+
+            with self.condition:
+                if not self.pending:
+                    continue
+                question_id, (question_type, answer, seq) = self.pending.popitem(last=False)
+                self.in_flight = question_id
+
+            result = save_question_answer(
+                self.exam_id,
+                self.user_id,
+                question_id,
+                question_type,
+                answer,
+                self.session_token,
+                base_answer=self.acknowledged.get(question_id)
+            )
+
+            # A failure caused by a dropped link keeps the answer queued for the reconnect
+            offline = not result and self.connectivity is not None and not self.connectivity.probe()
+
+            with self.condition:
+                self.in_flight = None
+                if result:
+                    self.acknowledged[question_id] = format_answer_for_api(question_type, answer)
+                    if self.journal and seq is not None:
+                        self.journal.record_ack(question_id, seq)
+                superseded = question_id in self.pending
+                if offline and not superseded:
+                    self.pending[question_id] = (question_type, answer, seq)
+                    self.pending.move_to_end(question_id, last=False)
+                self.condition.notify_all()
+
+            # A newer answer is already queued - its state will be reported instead
+            if offline:
+                self.save_state_changed.emit(question_id, "pending")
+            elif not superseded:
+                self.save_state_changed.emit(question_id, "saved" if result else "failed")
+
+        # Stopped and drained - nothing else writes to the journal
+        if self.journal:
+            self.journal.close()
+
+    def flush(self, timeout=None):
+        """Block until every queued answer has been sent. Returns False on timeout."""
+        with self.condition:
+            flushed = self.condition.wait_for(
+                lambda: not self.pending and self.in_flight is None,
+                timeout
+            )
+        if self.journal:
+            self.journal.sync()
+        return flushed
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+
+
+class AnswerAutosaver(QObject):
+    """
+    Autosave scheduler for free-text answer editors.
+
+    A save fires after idle_seconds without typing, and at the latest
+    max_interval_seconds after the first unsaved edit, so a burst of edits is
+    coalesced into a single save request.
+    """
+    def __init__(self, save_callback, idle_seconds=3, max_interval_seconds=30, parent=None):
+        super().__init__(parent)
+        self.save_callback = save_callback
+
+        self.idle_timer = QTimer(self)
+        self.idle_timer.setSingleShot(True)
+        self.idle_timer.setInterval(int(idle_seconds * 1000))
+        self.idle_timer.timeout.connect(self.fire)
+
+        self.max_interval_timer = QTimer(self)
+        self.max_interval_timer.setSingleShot(True)
+        self.max_interval_timer.setInterval(int(max_interval_seconds * 1000))
+        self.max_interval_timer.timeout.connect(self.fire)
+
+    def watch(self, editor):
+        editor.textChanged.connect(self.on_text_changed)
+
+    def on_text_changed(self):
+        # Restart the inactivity countdown, but never push back the interval deadline
+        self.idle_timer.start()
+        if not self.max_interval_timer.isActive():
+            self.max_interval_timer.start()
+
+    def fire(self):
+        self.cancel()
+        self.save_callback()
+
+    def cancel(self):
+        self.idle_timer.stop()
+        self.max_interval_timer.stop()
 
 
 class ExamPage(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.questions = []
+        self.questions = QuestionStore(parent=self)
+        self.questions.question_ready.connect(self.on_question_ready)
+        self.questions.question_failed.connect(self.on_question_fetch_failed)
+        self.placeholder_index = None
         self.current_question_index = 0
         self.user_answers = []
         self.exam_code = ""
@@ -3207,6 +6304,15 @@ class ExamPage(QWidget):
         self.user_id = None
         self.exam_submitted = False
         self.webcam_recorder = None
+        self.face_monitor = None
+        self.question_ids = []
+        self.answer_save_queue = None
+        self.answer_journal = None
+        self.queued_onstop_reason = None
+        self.queued_chunk_manifest = None
+        self.onstop_in_flight = False
+        self.save_states = {}
+        self.answer_question_index = {}
 
         self.timer = QTimer(self)
         self.remaining_seconds = 0
@@ -3214,6 +6320,15 @@ class ExamPage(QWidget):
 
         self.setup_ui()
 
+        # Offline mode: track server reachability and drain queued work on reconnect
+        self.connectivity = ConnectivityMonitor(parent=self)
+        self.connectivity.connectivity_changed.connect(self.on_connectivity_changed)
+
+        # Autosave descriptive and coding answers while the candidate types
+        self.answer_autosaver = AnswerAutosaver(self.autosave_current_answer, parent=self)
+        self.answer_autosaver.watch(self.description_editor)
+        self.answer_autosaver.watch(self.code_editor)
+
 
 
     def setup_ui(self):
@@ -3555,6 +6670,12 @@ class ExamPage(QWidget):
         timer_layout.addLayout(time_units_layout)
         right_layout.addWidget(timer_container)
 
+        # Connectivity indicator
+        self.connectivity_label = QLabel("● Online")
+        self.connectivity_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.connectivity_label.setStyleSheet("color: #2E7D32; font-size: 12px; font-weight: bold;")
+        right_layout.addWidget(self.connectivity_label)
+
         # Question Panel section
         question_panel_container = QWidget()
         question_panel_container.setStyleSheet("""
@@ -4240,42 +7361,76 @@ class ExamPage(QWidget):
         # Connect language selector to template setter
         self.language_selector.currentTextChanged.connect(self.set_language_template)
 
-    def start_recording(self):
-        if not hasattr(self, 'webcam_recorder') or self.webcam_recorder is None:
-            self.webcam_recorder = BackgroundWebcamRecorder(
+    def create_recorder(self):
+        """Build the recorder for the proctoring mode; runs on the recording thread"""
+        if PROCTORING_MODE == "stills":
+            recorder = StillFrameSampler(
+                token=self.session_token,
+                user_id=self.user_id,
+                exam_id=self.exam_id,
+                connectivity=self.connectivity
+            )
+            recorder.setup_recorder(shared_camera)
+        else:
+            recorder = BackgroundWebcamRecorder(
                 token=self.session_token,
                 exam_code=self.exam_code,
                 user_id=self.user_id,
-                exam_id=self.exam_id
+                exam_id=self.exam_id,
+                connectivity=self.connectivity
             )
-            self.webcam_recorder.setup_recorder(shared_camera.get_session())
+            recorder.setup_recorder(shared_camera.capture_session)
+        return recorder
+
+    def start_recording(self):
+        if self.webcam_recorder is None or self.exam_submitted:
+            return
+        if not self.webcam_recorder.is_ready():
+            self.webcam_recorder.create_recorder()
 
         if self.webcam_recorder.start_recording():
-            logging.info("Exam recording started successfully")
+            logging.info("Exam recording start requested")
         else:
             logging.error("Failed to start exam recording")
 
 
     def showEvent(self, event):
         super().showEvent(event)
+        if self.exam_submitted:
+            return
 
-        available_cameras = QMediaDevices.videoInputs()
-        if not available_cameras:
+        if not QMediaDevices.videoInputs():
             logging.error("No camera devices found")
             return
 
-        if not shared_camera.is_initialized:
-            camera_device = available_cameras[0]
-            if not shared_camera.initialize(camera_device):
-                logging.error("Failed to initialize shared camera")
-                return
+        # Recorder and chunk rotation run on the camera thread; the broker uses the selected camera
+        if self.webcam_recorder is None:
+            self.webcam_recorder = RecordingThread(self.create_recorder, parent=self)
 
-        if shared_camera.start_camera():
+        if self.webcam_recorder.setup_camera():
             logging.info("Camera started successfully")
+            self.start_face_monitor()
             QTimer.singleShot(1000, self.start_recording)
         else:
             logging.error("Failed to start camera")
 
+    def start_face_monitor(self):
+        if self.face_monitor is not None or os.environ.get("EVALUATE_FACE_MONITOR", "1") != "1":
+            return
+        self.face_monitor = FacePresenceMonitor(
+            token=self.session_token,
+            user_id=self.user_id,
+            exam_id=self.exam_id,
+            connectivity=self.connectivity,
+            parent=self
+        )
+        self.face_monitor.presence_event.connect(self.on_presence_event)
+        if not self.face_monitor.attach(shared_camera):
+            logging.error("Face presence monitor could not subscribe to the camera")
+
+    def on_presence_event(self, kind, event):
+        logging.warning(f"Face presence event during exam: {kind} {event}")
+
     def hideEvent(self, event):
         super().hideEvent(event)
         if self.webcam_recorder and self.webcam_recorder.is_ready():
@@ -4319,35 +7474,154 @@ class ExamPage(QWidget):
         
         # Load questions and build question panel
         question_ids = exam_details.get("questionsIds", [])
-        
-        fetched_questions = []
-        for idx, q_id in enumerate(question_ids):
-            question_data = fetch_question(q_id, self.exam_id, self.user_id, idx, first_request=False)
-            if question_data:
-                fetched_questions.append(question_data)
-                print(f"Successfully fetched question {q_id}")
-                
-                # Sync with server time from the first question response
-                if idx == 0 and 'remaining_time' in question_data:
-                    self.sync_with_server_time(question_data['remaining_time'])
-            else:
-                print(f"Failed to fetch question {q_id}")
-           
-        
-        self.questions = fetched_questions
-        self.user_answers = [None] * len(self.questions)
+
+        # Answers are journaled locally and saved by a background worker so navigation never blocks
+        if self.answer_save_queue:
+            self.answer_save_queue.stop()
+        try:
+            self.answer_journal = AnswerJournal(self.exam_code or self.exam_id)
+        except OSError as e:
+            logging.error(f"Answer journal unavailable, answers are kept in memory only: {e}")
+            self.answer_journal = None
+        self.answer_save_queue = AnswerSaveQueue(self.exam_id, self.user_id, self.session_token,
+                                                 journal=self.answer_journal, connectivity=self.connectivity,
+                                                 parent=self)
+        self.connectivity.start()
+        self.answer_save_queue.save_state_changed.connect(self.on_answer_save_state_changed)
+        self.save_states = {}
+        self.answer_question_index = {}
+
+        # Questions are fetched lazily around the current index
+        self.question_ids = list(question_ids)
+        self.questions.reset(self.question_ids, self.exam_id, self.user_id)
+        self.user_answers = [None] * len(self.question_ids)
         self.current_question_index = 0
-        
+
         # Only build and load if we have questions
-        if self.questions:
+        if self.question_ids:
+            self.restore_journaled_answers()
             self.build_question_panel()
-            self.load_question(0)
-            # Process events to ensure UI updates
-            QCoreApplication.processEvents()
+            self.load_question(0, store_current=False)
         else:
             # Display message if no questions are available
             self.question_label.setText("<b style='color:red'>No questions available. Please contact support.</b>")
 
+        # A submission queued offline in an earlier run is finished before anything else
+        queued = self.answer_journal.queued_submission() if self.answer_journal else None
+        if queued:
+            QTimer.singleShot(0, lambda: self.resume_queued_submission(queued))
+
+    def resume_queued_submission(self, record):
+        """Send the onstop notification an earlier run submitted while offline"""
+        logging.info(f"Resuming exam submission queued offline: {record.get('reason')}")
+        if self.timer.isActive():
+            self.timer.stop()
+        self.exam_submitted = True
+        self.queued_onstop_reason = record.get("reason")
+        self.queued_chunk_manifest = record.get("chunk_manifest")
+        if self.webcam_recorder:
+            self.webcam_recorder.stop_recording()
+        self.disable_all_inputs()
+
+        # Replayed answer saves go before the final notification
+        self.flush_answer_saves(lambda flushed: self.send_onstop_notification(
+            self.queued_onstop_reason, then=self.on_resumed_submission_sent))
+
+    def on_resumed_submission_sent(self, sent):
+        if sent:
+            self.show_submission_complete("Your exam, submitted while you were offline, has now reached the server. "
+                                          "Do you want to close the application?")
+        else:
+            self.show_offline_submission_notice()
+
+    def send_queued_onstop(self):
+        """Send the notification queued while offline, unless another path already sent it"""
+        if self.queued_onstop_reason:
+            self.send_onstop_notification(self.queued_onstop_reason, then=self.on_queued_onstop_sent)
+
+    def on_queued_onstop_sent(self, sent):
+        if sent:
+            self.show_submission_complete("You are back online and your exam has been submitted successfully! "
+                                          "Do you want to close the application?")
+
+    def on_question_ready(self, idx, question_data):
+        """Render a fetched question if the candidate is waiting on its placeholder"""
+        print(f"Successfully fetched question {self.question_ids[idx]}")
+
+        # Sync with server time from the first question response
+        if idx == 0 and 'remaining_time' in question_data:
+            self.sync_with_server_time(question_data['remaining_time'])
+
+        if idx == self.current_question_index and self.placeholder_index == idx:
+            self.load_question(idx, store_current=False)
+        else:
+            self.update_question_buttons(self.current_question_index)
+
+    def restore_journaled_answers(self):
+        """Restore answers from a previous run of this exam and replay unacknowledged saves"""
+        if not self.answer_journal or not self.answer_journal.entries:
+            return
+
+        index_by_id = {str(q_id): idx for idx, q_id in enumerate(self.question_ids)}
+        for question_id, entry in self.answer_journal.entries.items():
+            idx = index_by_id.get(question_id)
+            if idx is None:
+                continue
+            raw = entry.get("raw")
+            if entry.get("question_type") == "4" and raw is not None:
+                raw = tuple(raw)
+            self.user_answers[idx] = raw
+            self.answer_question_index[question_id] = idx
+            if entry["acked"]:
+                self.answer_save_queue.acknowledged[question_id] = entry["answer"]
+                self.save_states[idx] = "saved"
+
+        replay = [e for e in self.answer_journal.unacknowledged() if e["question_id"] in index_by_id]
+        for entry in replay:
+            idx = index_by_id[entry["question_id"]]
+            self.answer_save_queue.enqueue(entry["question_id"], entry["question_type"], self.user_answers[idx])
+        logging.info(f"Restored journaled answers, replaying {len(replay)} unacknowledged save(s)")
+
+    def on_answer_save_state_changed(self, question_id, state):
+        """Reflect a background save result on the question panel"""
+        q_index = self.answer_question_index.get(question_id)
+        if q_index is None:
+            return
+        self.save_states[q_index] = state
+        if state == "failed":
+            logging.error(f"Failed to save answer for question {question_id}")
+        self.update_question_buttons(self.current_question_index)
+
+    def on_question_fetch_failed(self, idx, attempt):
+        """Keep the placeholder informative while a question is being retried"""
+        print(f"Failed to fetch question {self.question_ids[idx]} (attempt {attempt}), retrying")
+        if idx == self.current_question_index and self.questions[idx] is None:
+            if self.connectivity.is_online():
+                self.question_label.setText("Still loading this question, retrying...")
+            else:
+                self.question_label.setText("You are offline. This question will load when the connection returns.")
+
+    def on_connectivity_changed(self, online):
+        """Update the indicator and, once the link is back, sync queued work in order"""
+        if online:
+            self.connectivity_label.setText("● Online")
+            self.connectivity_label.setStyleSheet("color: #2E7D32; font-size: 12px; font-weight: bold;")
+            self.connectivity.timer.setInterval(self.connectivity.interval_ms)
+
+            # Answer saves and video chunks resume on their own workers; the final
+            # notification waits for both inside send_onstop_notification
+            if self.queued_onstop_reason and not self.onstop_in_flight:
+                self.flush_answer_saves(lambda flushed: self.send_queued_onstop())
+
+            # Re-request anything the candidate is waiting on - nothing once submitted,
+            # when the question store has been stopped
+            if self.placeholder_index is not None and not self.exam_submitted and self.questions.prefetcher is not None:
+                self.questions.ensure_window(self.current_question_index)
+        else:
+            self.connectivity_label.setText("● Offline - answers are saved locally")
+            self.connectivity_label.setStyleSheet("color: #E53935; font-size: 12px; font-weight: bold;")
+            self.connectivity.timer.setInterval(self.connectivity.offline_interval_ms)
+
     def update_time_display(self):
         """Update the timer display based on remaining_seconds"""
         # Format time in hours:minutes:seconds
@@ -4421,8 +7695,15 @@ class ExamPage(QWidget):
             self.store_user_answer()
 
         self.current_question_index = index
+        self.questions.ensure_window(index)
         q_data = self.questions[index]
-        
+
+        # Question still in flight - show a placeholder until it arrives
+        if q_data is None:
+            self.show_question_placeholder(index)
+            return
+        self.placeholder_index = None
+
         # Sync with server time if available in the question data
         if 'remaining_time' in q_data:
             self.sync_with_server_time(q_data['remaining_time'])
@@ -4519,6 +7800,9 @@ class ExamPage(QWidget):
                 self.code_editor.clear()
                 self.language_selector.setCurrentIndex(0)  # Default to first language
 
+        # Restoring the saved answer is not an edit - drop any autosave it scheduled
+        self.answer_autosaver.cancel()
+
         # Update question panel buttons to mark current question
         self.update_question_buttons(index)
 
@@ -4542,6 +7826,27 @@ class ExamPage(QWidget):
         if was_active:
             QTimer.singleShot(10, self.activateWindow)
 
+    def show_question_placeholder(self, index):
+        """Show a loading placeholder for a question that is not in memory yet"""
+        self.placeholder_index = index
+        self.question_content_label.clear()
+        if hasattr(self, 'question_content_web'):
+            self.question_content_web.setHtml("")
+            self.question_content_web.hide()
+        self.clear_options()
+        self.description_container.hide()
+        self.coding_container.hide()
+        self.options_layout.parentWidget().hide()
+
+        self.question_number_pill.setText(f"• Question {index + 1}")
+        self.marks_label.setText("")
+        self.question_type_label.setText("")
+        self.question_label.setText("Loading question...")
+
+        self.update_question_buttons(index)
+        self.prev_button.setEnabled(index > 0)
+        self.next_button.setEnabled(index < len(self.questions) - 1)
+
     def show_correct_container(self, question_type):
         """
         Show only the container for the current question type
@@ -4902,6 +8207,14 @@ class ExamPage(QWidget):
                         border-radius: 20px;
                         font-weight: bold;
                     """)
+                elif not self.questions.has_been_fetched(q_index):
+                    # Question not fetched yet
+                    btn.setStyleSheet("""
+                        background-color: #F5F7FB;
+                        color: #A0A8B8;
+                        border: 1px dashed #C5CEDD;
+                        border-radius: 20px;
+                    """)
                 elif self.user_answers[q_index] is not None:
                     # Answered question
                     btn.setStyleSheet("""
@@ -4917,6 +8230,16 @@ class ExamPage(QWidget):
                         border-radius: 20px;
                     """)
 
+                # Overlay the answer save state
+                save_state = self.save_states.get(q_index)
+                if save_state in SAVE_STATE_BORDERS:
+                    btn.setStyleSheet(btn.styleSheet() + SAVE_STATE_BORDERS[save_state])
+                btn.setToolTip({
+                    "pending": "Saving answer...",
+                    "saved": "Answer saved",
+                    "failed": "Answer could not be saved",
+                }.get(save_state, ""))
+
     def build_question_panel(self):
         # Clear existing buttons
         for i in reversed(range(self.question_panel.count())):
@@ -4965,6 +8288,9 @@ class ExamPage(QWidget):
             return
             
         current_question = self.questions[self.current_question_index]
+        if current_question is None:
+            # Placeholder shown, nothing has been answered yet
+            return
         question_type = current_question.get("question_type", "2")  # Default to MCQ
         
         # Try different possible ID field names
@@ -5012,37 +8338,46 @@ class ExamPage(QWidget):
         # Save to API if the answer has changed
         if new_answer != previous_answer:
             print(f"Saving answer for question {question_id}. Previous: {previous_answer}, New: {new_answer}")
+            self.answer_question_index[str(question_id)] = self.current_question_index
             self.save_answer_to_api(question_id, question_type, new_answer)
         
         return new_answer
 
+    def autosave_current_answer(self):
+        """Persist the descriptive or coding answer being typed without navigating away"""
+        if self.exam_submitted or self.placeholder_index is not None or not self.questions:
+            return
+
+        current_question = self.questions[self.current_question_index]
+        if current_question and current_question.get("question_type", "2") in ("1", "4"):
+            self.store_user_answer()
+
     def save_answer_to_api(self, question_id, question_type, answer):
-        """Save a single answer to the API"""
+        """Queue a single answer for saving to the API in the background"""
         if not self.session_token:
             print("Warning: No session token provided. Cannot save answer to API.")
             return False
-        
-        try:
-            # Call the API function
-            result = save_question_answer(
-                self.exam_id,
-                self.user_id,
-                question_id,
-                question_type,
-                answer,
-                self.session_token
-            )
-            
-            if result:
-                print(f"Successfully saved answer for question {question_id}")
-                return True
-            else:
-                print(f"Failed to save answer for question {question_id}")
-                return False
-                
-        except Exception as e:
-            print(f"Error saving answer for question {question_id}: {str(e)}")
+
+        if not self.answer_save_queue:
+            print(f"Warning: Answer save queue not ready. Cannot save answer for question {question_id}.")
             return False
+
+        return self.answer_save_queue.enqueue(question_id, question_type, answer)
+
+    def flush_answer_saves(self, then, timeout=15):
+        """Let queued answer saves reach the server before submitting, then call then(flushed)"""
+        if not self.answer_save_queue:
+            then(True)
+            return
+
+        def on_flushed(flushed):
+            if not flushed:
+                logging.warning(f"Answer save queue not drained within {timeout}s")
+            then(flushed)
+
+        gui_tasks.run(self.answer_save_queue.flush, timeout,
+                      on_done=on_flushed,
+                      on_error=lambda e: on_flushed(False))
         
     def run_code(self):
         """Execute the code using the remote compiler API with proper error handling"""
@@ -5231,10 +8566,18 @@ class ExamPage(QWidget):
             except Exception as e:
                 logging.error(f"Failed to stop webcam during emergency exit: {e}")
             
+            # Give queued answer saves a short window to go out; the process exits
+            # right after, so this path waits instead of continuing in callbacks
+            try:
+                if self.answer_save_queue and not self.answer_save_queue.flush(5):
+                    logging.warning("Answer save queue not drained within 5s")
+            except Exception as e:
+                logging.error(f"Failed to flush answers during emergency exit: {e}")
+
             # Try to send notification
             try:
                 submit_reason = "EMERGENCY SUBMIT"
-                self.send_onstop_notification(submit_reason)
+                self.send_onstop_notification(submit_reason, blocking=True)
                 logging.info("Successfully sent onstop notification")
             except Exception as e:
                 logging.error(f"Failed to send notification during emergency exit: {e}")
@@ -5313,14 +8656,8 @@ class ExamPage(QWidget):
                 # Set submit reason for manual submission
                 submit_reason = "user submit"
                 
-                # Try to send the onstop notification - don't let failures prevent exit
-                try:
-                    self.send_onstop_notification(submit_reason)
-                    logging.info("Successfully sent onstop notification")
-                except Exception as e:
-                    logging.error(f"Failed to send onstop notification: {e}")
-                
-                # Mark exam as submitted
+                # Mark exam as submitted - inputs stay disabled while the saves and
+                # the notification go out in the background
                 self.exam_submitted = True
                 
                 # Try to disable all inputs
@@ -5330,22 +8667,11 @@ class ExamPage(QWidget):
                 except Exception as e:
                     logging.error(f"Failed to disable inputs: {e}")
                 
-                # Show success message
-                success_box = QMessageBox()
-                success_box.setWindowTitle("Exam Submitted")
-                success_box.setText("Your exam has been submitted successfully! Do you want to close the application?")
-                success_box.setStandardButtons(QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
-                success_box.setDefaultButton(QMessageBox.StandardButton.Yes)
-                success_box.setWindowFlags(success_box.windowFlags() | Qt.WindowType.WindowStaysOnTopHint)
-                
-                result = success_box.exec()
-                
-                # Most reliable exit method
-                if result == QMessageBox.StandardButton.Yes:
-                    logging.info("User confirmed exit after submission - force terminating")
-                    # Force-terminate the process
-                    import os
-                    os._exit(0)  # Force immediate termination
+                # Make sure every answer is on the server before the final notification
+                self.flush_answer_saves(lambda flushed: self.send_onstop_notification(
+                    submit_reason,
+                    then=lambda sent: self.on_submission_sent("Your exam has been submitted successfully! "
+                                                              "Do you want to close the application?")))
                 
             except Exception as e:
                 # Show error message if submission fails
@@ -5384,28 +8710,17 @@ class ExamPage(QWidget):
             # Set the submit reason for time end
             submit_reason = "Auto Submit Time Ends"
             
-            # Send the onstop API call
-            self.send_onstop_notification(submit_reason)
-            
             # Mark exam as submitted
             self.exam_submitted = True
             
             # We've already saved answers one by one, now disable all inputs
             self.disable_all_inputs()
-            
-            # Show success message
-            success_box = QMessageBox()
-            success_box.setWindowTitle("Exam Submitted")
-            success_box.setText("Your exam has been submitted automatically as time expired. Do you want to close the application?")
-            success_box.setStandardButtons(QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
-            success_box.setDefaultButton(QMessageBox.StandardButton.Yes)
-            
-            result = success_box.exec()
-            if result == QMessageBox.StandardButton.Yes:
-                # Fix for proper exit
-                logging.info("User confirmed exit after auto submission - closing application")
-                import sys
-                os._exit(0)  # Force exit with success code
+
+            # Make sure every answer is on the server, then send the onstop API call
+            self.flush_answer_saves(lambda flushed: self.send_onstop_notification(
+                submit_reason,
+                then=lambda sent: self.on_submission_sent("Your exam has been submitted automatically as time expired. "
+                                                          "Do you want to close the application?")))
             
         except Exception as e:
             # Show error message if submission fails
@@ -5418,6 +8733,54 @@ class ExamPage(QWidget):
             if self.webcam_recorder:
                 self.webcam_recorder.start_recording()
 
+    def show_submission_complete(self, message):
+        """Confirm the submission reached the server and offer to close the application"""
+        success_box = QMessageBox()
+        success_box.setWindowTitle("Exam Submitted")
+        success_box.setText(message)
+        success_box.setStandardButtons(QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        success_box.setDefaultButton(QMessageBox.StandardButton.Yes)
+        success_box.setWindowFlags(success_box.windowFlags() | Qt.WindowType.WindowStaysOnTopHint)
+
+        # Most reliable exit method
+        if success_box.exec() == QMessageBox.StandardButton.Yes:
+            logging.info("User confirmed exit after submission - force terminating")
+            os._exit(0)  # Force immediate termination
+
+    def queue_onstop(self, submit_reason):
+        """Hold the onstop notification until reconnect, on disk so a crash or restart still sends it"""
+        self.queued_onstop_reason = submit_reason
+        if self.webcam_recorder and self.webcam_recorder.is_ready():
+            self.queued_chunk_manifest = self.webcam_recorder.chunk_manifest()
+        if not self.answer_journal:
+            logging.warning("No answer journal - queued onstop notification is kept in memory only")
+            return
+        try:
+            self.answer_journal.queue_submission({
+                "reason": submit_reason,
+                "exam_id": self.exam_id,
+                "user_id": self.user_id,
+                "chunk_manifest": self.queued_chunk_manifest,
+                "queued_at": time.time(),
+            })
+        except OSError as e:
+            logging.error(f"Could not persist the queued onstop notification: {e}")
+
+    def clear_queued_onstop(self):
+        self.queued_onstop_reason = None
+        self.queued_chunk_manifest = None
+        if self.answer_journal:
+            self.answer_journal.clear_submission()
+
+    def show_offline_submission_notice(self):
+        """Tell the candidate their submission is queued until the connection returns"""
+        notice_box = QMessageBox()
+        notice_box.setWindowTitle("Submission Pending")
+        notice_box.setText("You are offline. Your answers are saved on this computer and your submission "
+                           "will be sent automatically when the connection returns. Please keep the application open.")
+        notice_box.setWindowFlags(notice_box.windowFlags() | Qt.WindowType.WindowStaysOnTopHint)
+        notice_box.exec()
+
     def check_if_submitted(self):
         """Check if exam is already submitted and prevent further actions"""
         if hasattr(self, 'exam_submitted') and self.exam_submitted:
@@ -5429,24 +8792,78 @@ class ExamPage(QWidget):
         return False
  
 
-    def send_onstop_notification(self, submit_reason):
+    def on_submission_sent(self, message):
+        """Finish a submission once its onstop notification went out or was queued"""
+        # Offline - the submission goes out on reconnect, so the app has to stay open
+        if self.queued_onstop_reason:
+            self.show_offline_submission_notice()
+            return
+
+        # Show success message
+        self.show_submission_complete(message)
+
+    def send_onstop_notification(self, submit_reason, then=None, blocking=False):
         """
         Send the onstop notification to the API endpoint
+
+        The request runs on a worker thread and then(sent) is called back on the
+        GUI thread. With blocking=True it runs inline and returns whether it was
+        sent - only for paths that exit the process right after.
+        """
+        then = then or (lambda sent: None)
+        if self.onstop_in_flight:
+            logging.info("Onstop notification already in flight")
+            return False
+
+        # A submission resumed after a restart has no recorder; it uses the session token
+        # and the chunk manifest stored with the queued notification
+        recorder = self.webcam_recorder if self.webcam_recorder and self.webcam_recorder.is_ready() else None
+        api_endpoint = recorder.api_endpoint if recorder else RECORDED_VIDEO_URL
+        token = recorder.token if recorder else self.session_token
+        
+        if not token:
+            logging.error("Cannot send onstop notification: token not available")
+            then(False)
+            return False
+
+        # Offline - send it once the link returns
+        if not self.connectivity.is_online():
+            logging.warning("Offline - onstop notification queued until reconnect")
+            self.queue_onstop(submit_reason)
+            then(False)
+            return False
+
+        args = (recorder, api_endpoint, token, submit_reason, self.queued_chunk_manifest)
+        if blocking:
+            return self.finish_onstop(submit_reason, self.post_onstop(*args), then)
+
+        self.onstop_in_flight = True
+        gui_tasks.run(self.post_onstop, *args,
+                      on_done=lambda outcome: self.finish_onstop(submit_reason, outcome, then),
+                      on_error=lambda e: self.finish_onstop(submit_reason, "failed", then))
+        return False
+
+    def finish_onstop(self, submit_reason, outcome, then):
+        """Apply the outcome of post_onstop on the GUI thread"""
+        self.onstop_in_flight = False
+        if outcome == "sent":
+            self.clear_queued_onstop()
+        elif outcome == "offline":
+            logging.warning("Offline - onstop notification queued until reconnect")
+            self.queue_onstop(submit_reason)
+        then(outcome == "sent")
+        return outcome == "sent"
+
+    def post_onstop(self, recorder, api_endpoint, token, submit_reason, stored_manifest):
+        """
+        Upload pending chunks and post the onstop notification. Blocking; runs on a
+        worker thread and returns "sent", "failed" or "offline".
         """
         try:
-            # Check if webcam_recorder exists and has the necessary attributes
-            if not hasattr(self, 'webcam_recorder') or not self.webcam_recorder:
-                logging.error("Cannot send onstop notification: webcam_recorder not available")
-                return False
-                
-            # Get API endpoint and token from the webcam recorder
-            api_endpoint = self.webcam_recorder.api_endpoint
-            token = self.webcam_recorder.token
-            
-            if not token:
-                logging.error("Cannot send onstop notification: token not available")
-                return False
-                
+            # Recorded chunks go before the final notification
+            if recorder:
+                recorder.flush_uploads(30)
+
             # Prepare the form data
             form_data = {
                 'exam_id': (None, str(self.exam_id)),
@@ -5455,6 +8872,11 @@ class ExamPage(QWidget):
                 'file_name': (None, f"{self.user_id}-{self.exam_id}"),
                 'exam_submit_reason': (None, submit_reason)
             }
+
+            # Every chunk with its hash, so the server can verify the recording is complete
+            chunk_manifest = recorder.chunk_manifest() if recorder else stored_manifest
+            if chunk_manifest:
+                form_data['chunk_manifest'] = (None, json.dumps(chunk_manifest))
             
             # Set headers with token
             headers = {
@@ -5465,8 +8887,9 @@ class ExamPage(QWidget):
             logging.debug(f"Sending onstop notification to: {api_endpoint}")
             logging.debug(f"Form data: {form_data}")
             
-            response = requests.post(
+            response = api_client.post(
                 api_endpoint,
+                priority=PRIORITY_CRITICAL,
                 files=form_data,
                 headers=headers
             )
@@ -5479,30 +8902,44 @@ class ExamPage(QWidget):
                     json_response = response.json()
                     if json_response.get('status') is True:
                         logging.info("Successfully sent onstop notification")
-                        return True
+                        missing = json_response.get('missing_chunks') or []
+                        if missing:
+                            logging.warning(f"Server is missing recorded chunks: {missing}")
+                            if recorder:
+                                recorder.reconcile_missing_chunks(missing)
+                        return "sent"
                     else:
                         logging.warning(f"Onstop notification response not as expected: {json_response}")
-                        return False
+                        return "failed"
                 except ValueError:
                     logging.error("Could not parse response as JSON")
-                    return False
+                    return "failed"
             else:
                 # More detailed error logging
                 logging.error(f"Failed to send onstop notification. Status code: {response.status_code}")
                 logging.error(f"Response text: {response.text}")
-                return False
+                return "failed"
                     
         except requests.RequestException as req_err:
             logging.error(f"Request error sending onstop notification: {str(req_err)}")
-            return False
+            return "failed" if self.connectivity.probe() else "offline"
         except Exception as e:
             logging.error(f"Unexpected error sending onstop notification: {str(e)}")
             logging.exception("Stack trace:")
-            return False
+            return "failed"
 
     # Add new method to disable all inputs after submission
     def disable_all_inputs(self):
         """Disable all input elements after exam submission"""
+        # Stop autosave and background question fetches, and let the save worker drain
+        self.answer_autosaver.cancel()
+        self.questions.stop()
+        self.placeholder_index = None
+        if self.answer_save_queue:
+            self.answer_save_queue.stop()
+        if self.face_monitor:
+            self.face_monitor.stop()
+
         # Disable description editor
         self.description_editor.setReadOnly(True)
         self.description_editor.setStyleSheet("""
@@ -5559,7 +8996,7 @@ class ExamPage(QWidget):
         current_index = self.current_question_index
         
         # Make sure we have the current question data
-        if self.questions and 0 <= current_index < len(self.questions):
+        if self.questions and 0 <= current_index < len(self.questions) and self.questions[current_index]:
             question_text = self.questions[current_index].get("question_title", "")
             question_type = self.questions[current_index].get("question_type", "2")  # Default to MCQ
             
@@ -6192,6 +9629,12 @@ def main():
             logging.error(f"Failed to initialize dialog monitor: {e}", exc_info=True)
             # Continue anyway as this is an enhancement, not core functionality
         
+        # Optional GUI responsiveness measurement
+        if os.environ.get("EVALUATE_LAG_MONITOR") == "1":
+            lag_monitor = EventLoopLagMonitor(parent=app)
+            lag_monitor.start()
+            logging.info("Event loop lag monitor enabled")
+
         # Create a timer to periodically check focus at the application level
         focus_timer = QTimer()
         focus_timer.timeout.connect(lambda: patched_check_app_focus(window))
@@ -6210,6 +9653,12 @@ def main():
                 # Signal thread to exit if it has a way to do so
                 if hasattr(blocking_thread, 'stop'):
                     blocking_thread.stop()
+
+            # Release pooled keep-alive connections and offload workers
+            for line in transmit_scheduler.stats():
+                logging.info(f"[TransmitScheduler] {line}")
+            api_client.close()
+            gui_tasks.shutdown()
             
             logging.info("Clean shutdown complete")
             
@@ -6221,7 +9670,11 @@ def main():
         window.raise_()
         
         logging.info("Application initialized successfully. Entering event loop.")
-        return app.exec()
+        exit_code = app.exec()
+
+        # The recorder was stopped on aboutToQuit; the camera goes last
+        shared_camera.shutdown()
+        return exit_code
         
     except Exception as e:
         logging.critical(f"Unhandled exception in main: {e}", exc_info=True)
@@ -0,0 +1,36 @@
+"""
+Shared test setup.
+
+final.py needs the full desktop stack (PyQt6, sounddevice, keyboard, ...),
+so each test module imports it with pytest.importorskip. The tests
+themselves only exercise code that runs without a display or camera.
+"""
+import os
+import sys
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+
+@pytest.fixture
+def serve():
+    """Start a local stand-in server for a handler class; returns the server, with base_url set"""
+    servers = []
+
+    def start(handler_class):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler_class)
+        server.daemon_threads = True
+        server.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
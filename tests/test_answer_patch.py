@@ -0,0 +1,131 @@
+import json
+import random
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+final = pytest.importorskip("final")
+
+ESSAY = " ".join(f"word{i}" for i in range(400))
+
+
+def patched(base, target):
+    patch = final.make_answer_patch(base, target)
+    assert patch is not None
+    return final.apply_answer_patch(base, patch), patch
+
+
+@pytest.mark.parametrize("target", [
+    ESSAY + " and a new closing sentence.",
+    "An opening line. " + ESSAY,
+    ESSAY.replace("word200", "a rewritten middle"),
+    ESSAY.replace(" word300", ""),
+    ESSAY,
+])
+def test_round_trip(target):
+    result, _ = patched(ESSAY, target)
+    assert result == target
+
+
+def test_round_trip_random_edits():
+    rng = random.Random(7)
+    text = ESSAY
+    for _ in range(200):
+        start = rng.randrange(len(text) + 1)
+        end = min(len(text), start + rng.randrange(20))
+        target = text[:start] + "".join(rng.choice("abc xyz\n") for _ in range(rng.randrange(15))) + text[end:]
+        patch = final.make_answer_patch(text, target)
+        if patch is not None:
+            assert final.apply_answer_patch(text, patch) == target
+        text = target
+
+
+def test_offsets_are_code_points():
+    base = "Grüße 😀 " + ESSAY
+    target = "Grüße 😀 inserted " + ESSAY
+    result, patch = patched(base, target)
+    assert result == target
+    # Eight code points before the insertion, although the UTF-8 prefix is 13 bytes long
+    assert patch["start"] == len("Grüße 😀 ") == 8
+    assert patch["text"] == "inserted "
+
+
+def test_no_patch_when_not_smaller():
+    assert final.make_answer_patch("short", "other") is None
+
+
+def test_wrong_base_is_rejected():
+    _, patch = patched(ESSAY, ESSAY + " more")
+    with pytest.raises(ValueError, match="base revision"):
+        final.apply_answer_patch(ESSAY + " edited elsewhere", patch)
+
+
+def test_tampered_patch_is_rejected():
+    _, patch = patched(ESSAY, ESSAY + " more")
+    patch["text"] = " less"
+    with pytest.raises(ValueError, match="result hash"):
+        final.apply_answer_patch(ESSAY, patch)
+
+
+def save_handler(reject_patches=False):
+    """Stand-in save-question-answer endpoint that applies patches like the server should"""
+    class Handler(BaseHTTPRequestHandler):
+        answers = {}
+        payloads = []
+
+        def do_POST(self):
+            payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            self.payloads.append(payload)
+            question_id = payload["question_id"]
+            status, body = 200, {"status": True}
+            if "answer_patch" in payload:
+                try:
+                    if reject_patches:
+                        raise ValueError("rejected")
+                    base = self.answers.get(question_id, "")
+                    self.answers[question_id] = final.apply_answer_patch(base, payload["answer_patch"])
+                except ValueError:
+                    status, body = 409, {"code": "answer_patch_mismatch"}
+            else:
+                self.answers[question_id] = payload["provided_answer"]
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+@pytest.fixture
+def delta_saves(monkeypatch, serve):
+    def start(reject_patches=False):
+        handler = save_handler(reject_patches)
+        server = serve(handler)
+        monkeypatch.setattr(final, "SAVE_ANSWER_URL", f"{server.base_url}/wp-json/api/v1/save-question-answer")
+        monkeypatch.setattr(final, "ANSWER_DELTA_SAVES", True)
+        return handler
+    return start
+
+
+def test_save_sends_patch_the_server_can_apply(delta_saves):
+    handler = delta_saves()
+    assert final.save_question_answer("e", "u", "q1", "1", ESSAY, "token")
+    assert final.save_question_answer("e", "u", "q1", "1", ESSAY + " more", "token", base_answer=ESSAY)
+
+    assert "provided_answer" in handler.payloads[0]
+    assert handler.payloads[1]["answer_patch"]["text"] == " more"
+    assert handler.answers["q1"] == ESSAY + " more"
+
+
+def test_rejected_patch_falls_back_to_full_upload(delta_saves):
+    handler = delta_saves(reject_patches=True)
+    assert final.save_question_answer("e", "u", "q1", "1", ESSAY + " more", "token", base_answer=ESSAY)
+
+    assert "answer_patch" in handler.payloads[0]
+    assert handler.payloads[1]["provided_answer"] == ESSAY + " more"
+    assert handler.answers["q1"] == ESSAY + " more"
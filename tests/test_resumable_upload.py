@@ -0,0 +1,207 @@
+import json
+import os
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+import requests
+
+final = pytest.importorskip("final")
+
+BLOCK = 1024
+
+
+def upload_session_handler(drop_block=None, start_offset=None, block_offset=None, no_sessions=False):
+    """
+    Stand-in for the upload session endpoints.
+
+    Keeps the bytes of every session and answers like the server should:
+    the start call reports the stored offset, a block at the wrong offset
+    gets 409 with the stored one. drop_block closes the connection without
+    answering on that block request (1-based), as a dropped link would.
+    start_offset and block_offset override the offsets the server reports.
+    """
+    class Handler(BaseHTTPRequestHandler):
+        sessions = {}
+        block_requests = []  # offsets the client sent blocks at
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            if no_sessions:
+                return self.send_json(404, {"code": "rest_no_route"})
+            if self.path.endswith("start-recorded-video-upload"):
+                payload = json.loads(body)
+                upload_id = payload.get("upload_id") or f"upload-{len(self.sessions) + 1}"
+                data = self.sessions.setdefault(upload_id, bytearray())
+                offset = len(data) if start_offset is None else start_offset
+                return self.send_json(200, {"upload_id": upload_id, "offset": offset})
+
+            offset = int(self.headers["Upload-Offset"])
+            self.block_requests.append(offset)
+            if len(self.block_requests) == drop_block:
+                self.close_connection = True
+                return
+            data = self.sessions[self.headers["Upload-Id"]]
+            if offset != len(data):
+                return self.send_json(409, {"offset": len(data) if block_offset is None else block_offset})
+            data.extend(body)
+            return self.send_json(200, {"offset": len(data) if block_offset is None else block_offset})
+
+        def send_json(self, status, payload):
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+@pytest.fixture
+def chunk_file(tmp_path):
+    path = tmp_path / "1-2_7.mp4"
+    path.write_bytes(os.urandom(BLOCK * 5 // 2))
+    return path
+
+
+@pytest.fixture
+def upload_server(monkeypatch, serve):
+    def start(**options):
+        handler = upload_session_handler(**options)
+        server = serve(handler)
+        monkeypatch.setattr(final, "RESUMABLE_UPLOAD_START_URL", f"{server.base_url}/start-recorded-video-upload")
+        monkeypatch.setattr(final, "RESUMABLE_UPLOAD_BLOCK_URL", f"{server.base_url}/upload-recorded-video-block")
+        return handler
+    return start
+
+
+def test_upload_in_blocks(upload_server, chunk_file):
+    handler = upload_server()
+    uploader = final.ResumableChunkUploader("token", block_size=BLOCK)
+    sessions = []
+    assert uploader.upload(str(chunk_file), {"chunk_index": 7}, on_session=sessions.append) is True
+
+    assert handler.block_requests == [0, BLOCK, 2 * BLOCK]
+    assert bytes(handler.sessions[sessions[0]]) == chunk_file.read_bytes()
+
+
+def test_interrupted_upload_resumes_at_server_offset(upload_server, chunk_file):
+    handler = upload_server(drop_block=3)
+    uploader = final.ResumableChunkUploader("token", block_size=BLOCK)
+    sessions = []
+    with pytest.raises(requests.ConnectionError):
+        uploader.upload(str(chunk_file), {"chunk_index": 7}, on_session=sessions.append)
+    assert len(handler.sessions[sessions[0]]) == 2 * BLOCK
+
+    # The next attempt reopens the same session and sends only the last block again
+    assert uploader.upload(str(chunk_file), {"chunk_index": 7}, upload_id=sessions[0]) is True
+    assert handler.block_requests == [0, BLOCK, 2 * BLOCK, 2 * BLOCK]
+    assert bytes(handler.sessions[sessions[0]]) == chunk_file.read_bytes()
+
+
+def test_conflict_continues_from_server_offset(upload_server, chunk_file):
+    handler = upload_server(start_offset=0)
+    handler.sessions["upload-1"] = bytearray(chunk_file.read_bytes()[:BLOCK])
+    uploader = final.ResumableChunkUploader("token", block_size=BLOCK)
+    assert uploader.upload(str(chunk_file), {"chunk_index": 7}, upload_id="upload-1") is True
+
+    assert handler.block_requests == [0, BLOCK, 2 * BLOCK]
+    assert bytes(handler.sessions["upload-1"]) == chunk_file.read_bytes()
+
+
+@pytest.mark.parametrize("options", [
+    {"start_offset": BLOCK * 10},
+    {"start_offset": 0, "block_offset": BLOCK * 10},
+    {"block_offset": BLOCK * 10},
+], ids=["start", "conflict", "acknowledged"])
+def test_offset_past_end_of_file_is_an_error(upload_server, chunk_file, options):
+    handler = upload_server(**options)
+    handler.sessions["upload-1"] = bytearray(chunk_file.read_bytes()[:BLOCK])
+    uploader = final.ResumableChunkUploader("token", block_size=BLOCK)
+    assert uploader.upload(str(chunk_file), {"chunk_index": 7}, upload_id="upload-1") is False
+
+
+def test_server_without_upload_sessions(upload_server, chunk_file):
+    upload_server(no_sessions=True)
+    uploader = final.ResumableChunkUploader("token", block_size=BLOCK)
+    assert uploader.upload(str(chunk_file), {"chunk_index": 7}) is None
+
+
+def multipart_handler(drop_first=False):
+    """Stand-in that parses a multipart upload; drop_first cuts the first one off mid-body"""
+    class Handler(BaseHTTPRequestHandler):
+        received = []
+        attempts = []
+
+        def do_POST(self):
+            length = int(self.headers["Content-Length"])
+            self.attempts.append(length)
+            if drop_first and len(self.attempts) == 1:
+                self.rfile.read(length // 2)
+                self.close_connection = True
+                return
+            body = self.rfile.read(length)
+            message = BytesParser(policy=HTTP).parsebytes(
+                f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode("utf-8") + body
+            )
+            self.received.append({
+                part.get_param("name", header="content-disposition"): (part.get_filename(), part.get_payload(decode=True))
+                for part in message.iter_parts()
+            })
+            self.send_response(200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def post_stream(url, chunk_file):
+    stream = final.MultipartFileStream(
+        {"exam_id": "2", "chunk_index": "7"}, "video", chunk_file.name, str(chunk_file), "video/mp4", block_size=BLOCK
+    )
+    return stream, requests.post(url, data=stream, headers={"Content-Type": stream.content_type,
+                                                            "Content-Length": str(len(stream))})
+
+
+def test_multipart_stream_body(serve, chunk_file):
+    handler = multipart_handler()
+    server = serve(handler)
+    stream, response = post_stream(server.base_url, chunk_file)
+
+    assert response.status_code == 200
+    assert handler.attempts == [len(stream)]
+    parts = handler.received[0]
+    assert parts["exam_id"] == (None, b"2")
+    assert parts["chunk_index"] == (None, b"7")
+    assert parts["video"] == (chunk_file.name, chunk_file.read_bytes())
+
+
+def test_multipart_stream_reads_in_blocks(chunk_file):
+    stream = final.MultipartFileStream({}, "video", chunk_file.name, str(chunk_file), "video/mp4", block_size=BLOCK)
+    sizes = []
+    while True:
+        data = stream.read(BLOCK // 2)
+        if not data:
+            break
+        sizes.append(len(data))
+    assert max(sizes) == BLOCK // 2
+    assert sum(sizes) == len(stream)
+
+
+def test_interrupted_multipart_upload_is_sent_again_whole(serve, chunk_file):
+    handler = multipart_handler(drop_first=True)
+    server = serve(handler)
+    with pytest.raises(requests.ConnectionError):
+        post_stream(server.base_url, chunk_file)
+
+    _, response = post_stream(server.base_url, chunk_file)
+    assert response.status_code == 200
+    assert handler.received[0]["video"] == (chunk_file.name, chunk_file.read_bytes())
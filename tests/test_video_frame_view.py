@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+final = pytest.importorskip("final")
+
+from PyQt6.QtCore import QSize
+from PyQt6.QtMultimedia import QVideoFrame, QVideoFrameFormat
+
+PixelFormat = QVideoFrameFormat.PixelFormat
+
+
+def make_frame(pixel_format, width, height, planes, direction=QVideoFrameFormat.Direction.TopToBottom):
+    """A memory-backed QVideoFrame with each plane filled from a (rows, bytes per row) array"""
+    frame_format = QVideoFrameFormat(QSize(width, height), pixel_format)
+    frame_format.setScanLineDirection(direction)
+    frame = QVideoFrame(frame_format)
+    assert frame.map(QVideoFrame.MapMode.WriteOnly)
+    for index, data in enumerate(planes):
+        stride = frame.bytesPerLine(index)
+        ptr = frame.bits(index)
+        ptr.setsize(frame.mappedBytes(index))
+        target = np.frombuffer(ptr, np.uint8)[:stride * data.shape[0]].reshape(data.shape[0], stride)
+        target[:, :data.shape[1]] = data
+    frame.unmap()
+    return frame
+
+
+def gradient(width, height):
+    y, x = np.mgrid[0:height, 0:width]
+    return ((x * 3 + y * 7) % 256).astype(np.uint8)
+
+
+def nv12_frame(luma):
+    height, width = luma.shape
+    chroma = np.full((height // 2, width), 200, np.uint8)
+    return make_frame(PixelFormat.Format_NV12, width, height, [luma, chroma])
+
+
+def packed_frame(pixel_format, luma, y_offset):
+    height, width = luma.shape
+    packed = np.full((height, width * 2), 200, np.uint8)
+    packed[:, y_offset::2] = luma
+    return make_frame(pixel_format, width, height, [packed])
+
+
+@pytest.mark.parametrize("name, build", [
+    ("NV12", nv12_frame),
+    ("YUYV", lambda luma: packed_frame(PixelFormat.Format_YUYV, luma, 0)),
+    ("UYVY", lambda luma: packed_frame(PixelFormat.Format_UYVY, luma, 1)),
+])
+def test_luma_is_a_read_only_view_of_the_y_samples(name, build):
+    luma = gradient(64, 48)
+    frame = build(luma)
+    with final.VideoFrameView(frame) as view:
+        result = view.luma()
+        assert result.shape == (48, 64)
+        np.testing.assert_array_equal(result, luma)
+        assert not result.flags.writeable
+        assert not result.flags.owndata
+
+
+def test_bottom_to_top_frame_is_flipped():
+    luma = gradient(32, 16)
+    chroma = np.zeros((8, 32), np.uint8)
+    frame = make_frame(PixelFormat.Format_NV12, 32, 16, [luma, chroma], QVideoFrameFormat.Direction.BottomToTop)
+    with final.VideoFrameView(frame) as view:
+        np.testing.assert_array_equal(view.luma(), luma[::-1])
+
+
+def test_rgb_frame_has_no_luma():
+    frame = make_frame(PixelFormat.Format_BGRA8888, 32, 16, [np.zeros((16, 128), np.uint8)])
+    with final.VideoFrameView(frame) as view:
+        assert view.luma() is None
+    assert final.luma_thumbnail(frame, 16) is None
+
+
+def test_luma_outside_the_with_block():
+    view = final.VideoFrameView(nv12_frame(gradient(32, 16)))
+    assert view.luma() is None
+    with view:
+        pass
+    assert view.luma() is None and not view.mapped
+
+
+def test_luma_thumbnail_subsamples_and_outlives_the_mapping():
+    luma = gradient(640, 480)
+    thumbnail = final.luma_thumbnail(nv12_frame(luma), 160)
+    np.testing.assert_array_equal(thumbnail, luma[::4, ::4])
+    assert thumbnail.flags.c_contiguous and thumbnail.flags.owndata
+
+
+def test_packed_thumbnail_matches_planar():
+    luma = gradient(320, 240)
+    planar = final.luma_thumbnail(nv12_frame(luma), 80)
+    packed = final.luma_thumbnail(packed_frame(PixelFormat.Format_YUYV, luma, 0), 80)
+    np.testing.assert_array_equal(planar, packed)